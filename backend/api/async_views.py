@@ -0,0 +1,212 @@
+from abc import ABCMeta, abstractmethod
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.decorators import classonlymethod
+from django.views import View
+from django_filters.utils import translate_validation
+from rest_framework.exceptions import (
+    APIException, AuthenticationFailed, NotFound
+)
+from rest_framework.renderers import JSONRenderer
+
+from api.authentication import CachedTokenAuthentication
+from api.cache import INGREDIENTS_VERSION, TAGS_VERSION, user_version
+from api.cards import refresh_recipe_cards
+from api.constants import RESPONSE_CACHE_TIMEOUT
+from api.filters import IngredientFilter
+from api.mixins import (
+    conditional_headers, get_cached_response, response_cache_key,
+    set_conditional_headers
+)
+from api.registry import tag_registry
+from api.routers import pin_primary_after_change
+from api.serializers import (
+    IngredientSerializer, RecipeCardSerializer, TagSerializer
+)
+from api.views import RecipeViewSet
+from recipes.models import Ingredient, Recipe, RecipeCard
+
+
+class AsyncReadView(View, metaclass=ABCMeta):
+    """
+    Асинхронное представление только для чтения для режима ASGI.
+
+    Отвечает так же, как соответствующий ViewSet: тот же JSON и коды
+    ошибок, ETag и Last-Modified по версиям данных, аутентификация
+    по токену, кеш анонимных ответов с общими ключами. Остальные
+    методы передаются в sync_view. Наследники задают version_names
+    и реализуют get_data.
+
+    В Django 4.2 асинхронный ORM выполняет запросы через
+    sync_to_async(thread_sensitive=True), то есть в одном общем потоке
+    процесса, по очереди. Поток не занимают только ожидание клиента
+    и проверки по версиям в кеше, поэтому при быстрой БД такие
+    представления медленнее синхронных.
+    """
+
+    http_method_names = ('get', 'head')
+    version_names = ()
+    user_dependent = False
+    authentication = CachedTokenAuthentication()
+    # Части ключа кеша анонимных ответов, как у ViewSet
+    # (basename и action), None — ответы не кешируются.
+    response_cache_parts = None
+    cache_version_names = ()
+    cache_query_params = ()
+
+    @classonlymethod
+    def as_view(cls, sync_view=None, **initkwargs):
+        view = super().as_view(**initkwargs)
+        if sync_view is None:
+            return view
+
+        async def dispatch(request, *args, **kwargs):
+            if request.method in ('GET', 'HEAD'):
+                return await view(request, *args, **kwargs)
+            return await sync_to_async(sync_view)(request, *args, **kwargs)
+
+        # csrf_exempt в Django 4.2 не сохраняет признак корутины.
+        dispatch.csrf_exempt = True
+        return dispatch
+
+    async def get(self, request, *args, **kwargs):
+        user = AnonymousUser()
+        if self.user_dependent:
+            try:
+                credentials = await sync_to_async(
+                    self.authentication.authenticate,
+                )(request)
+            except AuthenticationFailed as error:
+                response = self.render({'detail': error.detail}, 401)
+                response['WWW-Authenticate'] = (
+                    self.authentication.authenticate_header(request)
+                )
+                return response
+            if credentials is not None:
+                user = credentials[0]
+
+        names = list(self.version_names)
+        if self.user_dependent and user.is_authenticated:
+            names.append(user_version(user.pk))
+        # Только кеш, без БД: можно не ждать общего потока синхронного кода.
+        etag, last_modified = await sync_to_async(
+            conditional_headers, thread_sensitive=False,
+        )(request, names)
+        pin_primary_after_change(last_modified)
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified,
+        )
+        if response is None:
+            response = await self.get_response(request, user, **kwargs)
+        set_conditional_headers(response, etag, last_modified)
+        return response
+
+    async def get_response(self, request, user, **kwargs):
+        key = None
+        if self.response_cache_parts is not None and user.is_anonymous:
+            key = await sync_to_async(
+                response_cache_key, thread_sensitive=False,
+            )(
+                request, (*self.response_cache_parts, kwargs.get('pk', '')),
+                self.cache_version_names, self.cache_query_params,
+            )
+        if key is not None:
+            data = await sync_to_async(
+                get_cached_response, thread_sensitive=False,
+            )(key)
+            if data is not None:
+                response = self.render(data)
+                response['X-Cache'] = 'HIT'
+                return response
+        try:
+            data = await self.get_data(request, user, **kwargs)
+        except APIException as error:
+            return self.render(error.detail, error.status_code)
+        if data is None:
+            return self.render({'detail': NotFound.default_detail}, 404)
+        response = self.render(data)
+        if key is not None:
+            await cache.aset(key, data, RESPONSE_CACHE_TIMEOUT)
+            response['X-Cache'] = 'MISS'
+        return response
+
+    @abstractmethod
+    async def get_data(self, request, user, **kwargs):
+        """
+        Данные ответа, None — объект не найден. Ошибки запроса
+        передаются исключениями DRF.
+        """
+
+    @staticmethod
+    def render(data, status=200):
+        return HttpResponse(
+            JSONRenderer().render(data),
+            content_type='application/json',
+            status=status,
+        )
+
+
+class TagListView(AsyncReadView):
+    version_names = (TAGS_VERSION,)
+
+    async def get_data(self, request, user):
+        return TagSerializer(await tag_registry.aall(), many=True).data
+
+
+class TagDetailView(AsyncReadView):
+    version_names = (TAGS_VERSION,)
+
+    async def get_data(self, request, user, pk):
+        tag = await tag_registry.aget(pk)
+        return None if tag is None else TagSerializer(tag).data
+
+
+class IngredientListView(AsyncReadView):
+    version_names = (INGREDIENTS_VERSION,)
+
+    async def get_data(self, request, user):
+        filterset = IngredientFilter(
+            request.GET, queryset=Ingredient.objects.all(),
+        )
+        if not filterset.is_valid():
+            raise translate_validation(filterset.errors)
+        ingredients = [ingredient async for ingredient in filterset.qs]
+        return IngredientSerializer(ingredients, many=True).data
+
+
+class IngredientDetailView(AsyncReadView):
+    version_names = (INGREDIENTS_VERSION,)
+
+    async def get_data(self, request, user, pk):
+        ingredient = await Ingredient.objects.filter(pk=pk).afirst()
+        if ingredient is None:
+            return None
+        return IngredientSerializer(ingredient).data
+
+
+class RecipeDetailView(AsyncReadView):
+    version_names = RecipeViewSet.version_names
+    user_dependent = True
+    response_cache_parts = ('recipes', 'retrieve')
+    cache_version_names = RecipeViewSet.cache_version_names
+    cache_query_params = RecipeViewSet.cache_query_params
+
+    async def get_data(self, request, user, pk):
+        recipe = await Recipe.objects.with_card(user).filter(pk=pk).afirst()
+        if recipe is None:
+            return None
+        try:
+            recipe.card
+        except RecipeCard.DoesNotExist:
+            cards = await sync_to_async(refresh_recipe_cards)([recipe.pk])
+            if recipe.pk not in cards:
+                # Рецепт прочитан с реплики, но удалён в основной БД.
+                return None
+            recipe.card = cards[recipe.pk]
+        return RecipeCardSerializer(
+            recipe, context={'request': request},
+        ).data
@@ -0,0 +1,79 @@
+import copy
+import time
+from collections import OrderedDict
+from threading import Lock
+
+from django.conf import settings
+from rest_framework.authentication import TokenAuthentication
+
+from api.cache import get_version, incr_counter, token_version
+from api.constants import (
+    TOKEN_CACHE_HITS, TOKEN_CACHE_MISSES, TOKEN_CACHE_STATS_FLUSH
+)
+
+
+class TokenCache:
+    """
+    Ограниченный по размеру и времени жизни LRU-кеш токенов процесса.
+
+    Запись сбрасывается сменой общей версии своего токена: её меняют
+    выход из системы, смена пароля и деактивация пользователя.
+    """
+
+    def __init__(self, max_size, ttl):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._lock = Lock()
+        self._entries = OrderedDict()
+        self._stats = {TOKEN_CACHE_HITS: 0, TOKEN_CACHE_MISSES: 0}
+
+    def get(self, key, version):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                credentials, entry_version, expires = entry
+                if entry_version == version and expires > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self._count(TOKEN_CACHE_HITS)
+                    return credentials
+                del self._entries[key]
+            self._count(TOKEN_CACHE_MISSES)
+            return None
+
+    def set(self, key, credentials, version):
+        with self._lock:
+            self._entries[key] = (
+                credentials, version, time.monotonic() + self.ttl,
+            )
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def _count(self, name):
+        # Общие счётчики обновляются пачками, а не на каждый запрос.
+        self._stats[name] += 1
+        if sum(self._stats.values()) >= TOKEN_CACHE_STATS_FLUSH:
+            for stat, value in self._stats.items():
+                if value:
+                    incr_counter(stat, value)
+            self._stats = dict.fromkeys(self._stats, 0)
+
+
+token_cache = TokenCache(
+    settings.TOKEN_CACHE_MAX_SIZE, settings.TOKEN_CACHE_TTL,
+)
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """Аутентификация по токену с кешем «токен → пользователь»."""
+
+    def authenticate_credentials(self, key):
+        version = get_version(token_version(key))
+        credentials = token_cache.get(key, version)
+        if credentials is None:
+            credentials = super().authenticate_credentials(key)
+            token_cache.set(key, credentials, version)
+        user, token = credentials
+        # Копия, чтобы изменения пользователя в одном запросе
+        # не попадали в другие запросы через кеш.
+        return copy.copy(user), token
@@ -0,0 +1,70 @@
+from bisect import bisect_left
+from threading import Lock
+
+from api.cache import INGREDIENTS_VERSION, get_version
+from api.routers import use_primary
+from recipes.models import Ingredient
+
+
+class IngredientAutocomplete:
+    """
+    Поиск ингредиентов по началу и вхождению названия в памяти процесса.
+
+    Названия хранятся отсортированными в нижнем регистре, поэтому
+    совпадения по началу находятся двоичным поиском. Индекс
+    перечитывается из БД, когда меняется версия ингредиентов.
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self._version = None
+        self._index = ([], [])
+
+    @use_primary()
+    def _load(self, version):
+        rows = sorted(
+            (name.lower(), pk, name, measurement_unit)
+            for pk, name, measurement_unit in Ingredient.objects.values_list(
+                'pk', 'name', 'measurement_unit',
+            )
+        )
+        self._index = (
+            [row[0] for row in rows],
+            [
+                {'id': pk, 'name': name, 'measurement_unit': unit}
+                for _, pk, name, unit in rows
+            ],
+        )
+        self._version = version
+
+    def _ensure_loaded(self):
+        version = get_version(INGREDIENTS_VERSION)
+        if version != self._version:
+            with self._lock:
+                if version != self._version:
+                    self._load(version)
+
+    def search(self, query, limit):
+        """Сначала совпадения по началу названия, затем по вхождению."""
+        self._ensure_loaded()
+        keys, items = self._index
+        query = query.strip().lower()
+
+        start = bisect_left(keys, query)
+        end = start
+        while end < len(keys) and end - start < limit:
+            if not keys[end].startswith(query):
+                break
+            end += 1
+        results = items[start:end]
+
+        if query and len(results) < limit:
+            for key, item in zip(keys, items):
+                if query in key and not key.startswith(query):
+                    results.append(item)
+                    if len(results) == limit:
+                        break
+        return results
+
+
+ingredient_autocomplete = IngredientAutocomplete()
@@ -0,0 +1,98 @@
+import time
+from hashlib import md5
+
+from django.core.cache import cache
+from django.db import transaction
+
+VERSION_KEY = 'version:{}'
+MODIFIED_KEY = 'modified:{}'
+COUNTER_KEY = 'counter:{}'
+RECIPES_VERSION = 'recipes'
+# Меняется вместе с числом добавлений рецептов в избранное.
+FAVORITES_VERSION = 'favorites'
+# Меняется при изменении состава рецептов, их добавлении и удалении.
+RECIPE_INGREDIENTS_VERSION = 'recipe_ingredients'
+TAGS_VERSION = 'tags'
+INGREDIENTS_VERSION = 'ingredients'
+
+
+def user_version(user_id):
+    """Имя версии данных пользователя: избранное, корзина, подписки."""
+    return f'user:{user_id}'
+
+
+def author_version(author_id):
+    """
+    Имя версии набора рецептов автора: меняется при добавлении
+    и удалении его рецептов, но не при их изменении.
+    """
+    return f'author:{author_id}'
+
+
+def token_version(key):
+    """
+    Имя версии токена: меняется при выходе, смене пароля
+    и деактивации владельца. Сам токен в имя не попадает.
+    """
+    return f'token:{md5(key.encode()).hexdigest()}'
+
+
+def _initial_version():
+    # После вытеснения ключа версия не должна совпасть со старой.
+    return time.time_ns()
+
+
+def get_version(name):
+    """Текущая версия набора данных, общая для всех процессов."""
+    return get_versions((name,))[name]
+
+
+def get_versions(names):
+    """Версии нескольких наборов данных одним обращением к кешу."""
+    keys = {VERSION_KEY.format(name): name for name in names}
+    found = cache.get_many(keys)
+    versions = {keys[key]: version for key, version in found.items()}
+    for key, name in keys.items():
+        if key not in found:
+            cache.add(key, _initial_version(), timeout=None)
+            cache.add(MODIFIED_KEY.format(name), time.time(), timeout=None)
+            versions[name] = cache.get(key)
+    return versions
+
+
+def get_last_modified(names):
+    """Время последнего изменения любого из наборов данных."""
+    found = cache.get_many([MODIFIED_KEY.format(name) for name in names])
+    return max(found.values(), default=None)
+
+
+def bump_version(name):
+    """
+    Отмечает изменение набора данных для всех процессов после фиксации
+    текущей транзакции. Иначе параллельный запрос может прочитать ещё
+    старые данные и закешировать их под новой версией.
+    """
+    transaction.on_commit(lambda: _bump_version(name))
+
+
+def _bump_version(name):
+    key = VERSION_KEY.format(name)
+    cache.set(MODIFIED_KEY.format(name), time.time(), timeout=None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, _initial_version(), timeout=None)
+
+
+def incr_counter(name, delta=1):
+    """Увеличивает общий для всех процессов счётчик."""
+    key = COUNTER_KEY.format(name)
+    try:
+        cache.incr(key, delta)
+    except ValueError:
+        cache.add(key, delta, timeout=None)
+
+
+def get_counters(names):
+    found = cache.get_many([COUNTER_KEY.format(name) for name in names])
+    return {name: found.get(COUNTER_KEY.format(name), 0) for name in names}
@@ -0,0 +1,46 @@
+from api.cache import RECIPES_VERSION, bump_version
+from api.routers import use_primary
+from recipes.models import Recipe, RecipeCard
+
+# Поля, которые берутся из строки рецепта при каждом выводе,
+# а не из карточки: флаги пользователя и часто меняющиеся счётчики.
+# Изменение favorites_count отмечается версией FAVORITES_VERSION.
+LIVE_FIELDS = ('is_favorited', 'is_in_shopping_cart', 'favorites_count')
+
+
+@use_primary()
+def refresh_recipe_cards(recipe_ids):
+    """
+    Пересобирает карточки рецептов пакетно. Данные читаются
+    из основной БД, чтобы не сохранить карточку с отставшей реплики.
+    """
+    from api.serializers import GetRecipeSerializer
+
+    recipes = Recipe.objects.with_user_flags(None).filter(pk__in=recipe_ids)
+    cards = []
+    for recipe in recipes:
+        data = dict(GetRecipeSerializer(recipe).data)
+        for field in LIVE_FIELDS:
+            data.pop(field, None)
+        data['author'] = dict(data['author'])
+        data['author'].pop('is_subscribed', None)
+        thumbnail = recipe.image_variant('image_thumbnail')
+        data['image_thumbnail'] = thumbnail.url if thumbnail else None
+        cards.append(RecipeCard(recipe=recipe, data=data))
+
+    RecipeCard.objects.bulk_create(
+        cards,
+        update_conflicts=True,
+        unique_fields=('recipe',),
+        update_fields=('data', 'updated'),
+    )
+    return {card.recipe_id: card for card in cards}
+
+
+def invalidate_recipe_cards(**lookups):
+    """
+    Удаляет устаревшие карточки, они пересоберутся при чтении,
+    и меняет версию рецептов для валидаторов HTTP-кеширования.
+    """
+    RecipeCard.objects.filter(**lookups).delete()
+    bump_version(RECIPES_VERSION)
@@ -1,2 +1,54 @@
 MIN_AMOUNT = 0
 MIN_COOKING_TIME = 0
+
+SHOPPING_CART_TITLE = 'Корзина покупок'
+SHOPPING_CART_FILENAME = 'shopping-list'
+SHOPPING_CART_FORMAT_PARAM = 'file_format'
+SHOPPING_CART_CHUNK_SIZE = 500
+SHOPPING_CART_PDF_FONT_NAME = 'ShoppingCart'
+SHOPPING_CART_PDF_FONT_SIZE = 12
+SHOPPING_CART_PDF_MARGIN = 50
+
+AUTOCOMPLETE_LIMIT = 10
+AUTOCOMPLETE_MAX_LIMIT = 50
+
+RESPONSE_CACHE_TIMEOUT = 60 * 10
+RESPONSE_CACHE_HITS = 'response_cache_hits'
+RESPONSE_CACHE_MISSES = 'response_cache_misses'
+
+TOKEN_CACHE_HITS = 'token_cache_hits'
+TOKEN_CACHE_MISSES = 'token_cache_misses'
+TOKEN_CACHE_STATS_FLUSH = 100
+
+RECIPE_IMAGE_VARIANTS = {
+    'image_webp': (1280, 1280),
+    'image_thumbnail': (480, 480),
+}
+RECIPE_IMAGE_QUALITY = 85
+RECIPE_IMAGE_ROTATED = (5, 6, 7, 8)
+EXIF_ORIENTATION = 0x0112
+
+SUBSCRIPTION_RECIPES_MAX_LIMIT = 50
+
+RECIPE_ORDERINGS = {
+    'new': ('-pub_date',),
+    'popular': ('-popularity', '-pub_date'),
+}
+
+FEED_TIMELINE_KEY = 'feed:{}:{}'
+FEED_TIMELINE_SIZE = 200
+FEED_TIMELINE_TIMEOUT = 60 * 5
+
+SEARCH_CONFIG = 'russian'
+SEARCH_MAX_TERMS = 10
+
+MATCH_MAX_INGREDIENTS = 100
+
+BULK_MAX_ITEMS = 100
+
+DB_CONNECTIONS = 'db_connections'
+DB_CONNECTION_WAIT_US = 'db_connection_wait_us'
+DB_POOL_TIMEOUTS = 'db_pool_timeouts'
+DB_STATS_FLUSH = 50
+DB_STATS_FLUSH_INTERVAL = 10
+DB_POOL_CHECK_INTERVAL = 30
@@ -1,7 +1,11 @@
 from django.contrib.auth import get_user_model
+from django.db.models import Exists, OuterRef
 from django_filters import rest_framework as filters
 
-from recipes.models import Ingredient, Recipe, Tag
+from api.constants import RECIPE_ORDERINGS
+from api.registry import tag_registry
+from api.search import search_recipes
+from recipes.models import Favorite, Ingredient, Recipe, ShoppingCart
 
 User = get_user_model()
 
@@ -20,22 +24,37 @@ class IngredientFilter(filters.FilterSet):
 
 
 class RecipeFilter(filters.FilterSet):
-    """Фильтрация по избранному, автору, списку покупок и тегам."""
+    """
+    Фильтрация по избранному, автору, списку покупок и тегам,
+    полнотекстовый поиск, сортировка по новизне или популярности.
+
+    Связанные таблицы проверяются подзапросами EXISTS, а не JOIN,
+    поэтому рецепт попадает в выдачу один раз без DISTINCT.
+    """
 
     is_favorited = filters.BooleanFilter(
         method='get_favorite',
         label='Избранные группы',
     )
-    tags = filters.ModelMultipleChoiceFilter(
-        field_name='tags__slug',
+    tags = filters.MultipleChoiceFilter(
+        method='get_tags',
         label='Тэги',
-        to_field_name='slug',
-        queryset=Tag.objects.all(),
+        # Не связанный метод: FilterSet копирует поля через deepcopy.
+        choices=lambda: tag_registry.slug_choices(),
     )
     is_in_shopping_cart = filters.BooleanFilter(
         method='get_is_in_shopping_cart',
         label='Рецепты в корзине',
     )
+    search = filters.CharFilter(
+        method='get_search',
+        label='Поиск',
+    )
+    ordering = filters.ChoiceFilter(
+        method='get_ordering',
+        label='Сортировка',
+        choices=[(value, value) for value in RECIPE_ORDERINGS],
+    )
 
     class Meta:
         model = Recipe
@@ -44,14 +63,34 @@ class RecipeFilter(filters.FilterSet):
             'is_favorited',
             'is_in_shopping_cart',
             'author',
+            'search',
+            'ordering',
         )
 
-    def get_favorite(self, queryset, name, value):
+    def get_tags(self, queryset, name, value):
+        # Тег мог быть удалён после проверки значения фильтра.
+        tags = (tag_registry.get_by_slug(slug) for slug in value)
+        tag_ids = [tag.pk for tag in tags if tag is not None]
+        return queryset.filter(Exists(Recipe.tags.through.objects.filter(
+            recipe=OuterRef('pk'), tag_id__in=tag_ids,
+        )))
+
+    def filter_user_list(self, queryset, model, value):
+        """Рецепты из списка пользователя: избранного или корзины."""
         if value and self.request.user.is_authenticated:
-            return queryset.filter(favorites__user=self.request.user)
+            return queryset.filter(Exists(model.objects.filter(
+                user=self.request.user, recipe=OuterRef('pk'),
+            )))
         return queryset
 
+    def get_favorite(self, queryset, name, value):
+        return self.filter_user_list(queryset, Favorite, value)
+
     def get_is_in_shopping_cart(self, queryset, name, value):
-        if value and self.request.user.is_authenticated:
-            return queryset.filter(shopping_list__user=self.request.user)
-        return queryset
+        return self.filter_user_list(queryset, ShoppingCart, value)
+
+    def get_search(self, queryset, name, value):
+        return search_recipes(queryset, value)
+
+    def get_ordering(self, queryset, name, value):
+        return queryset.order_by(*RECIPE_ORDERINGS[value])
@@ -0,0 +1,120 @@
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import close_old_connections, transaction
+from PIL import Image, ImageOps
+
+from api.cards import invalidate_recipe_cards
+from api.constants import (
+    EXIF_ORIENTATION, RECIPE_IMAGE_QUALITY, RECIPE_IMAGE_ROTATED,
+    RECIPE_IMAGE_VARIANTS
+)
+from api.routers import use_primary
+from recipes.models import Recipe
+
+logger = logging.getLogger(__name__)
+
+executor = ThreadPoolExecutor(
+    max_workers=settings.IMAGE_PROCESSING_WORKERS,
+    thread_name_prefix='recipe-image',
+)
+
+
+def image_dimensions(upload):
+    """
+    Размеры загруженного изображения с учётом ориентации из EXIF.
+
+    Используется изображение, которое открыл Pillow при проверке
+    загрузки, поэтому файл повторно не читается.
+    """
+    image = upload.image
+    width, height = image.size
+    # После verify() файл закрыт, поэтому EXIF читается из info
+    # без повторной загрузки изображения.
+    exif = Image.Exif()
+    if 'exif' in image.info:
+        exif.load(image.info['exif'])
+    if exif.get(EXIF_ORIENTATION) in RECIPE_IMAGE_ROTATED:
+        width, height = height, width
+    return {'image_width': width, 'image_height': height}
+
+
+def schedule_image_processing(recipe_id):
+    """Отправляет изображение рецепта в обработку после фиксации записи."""
+    transaction.on_commit(
+        lambda: executor.submit(_process_in_worker, recipe_id)
+    )
+
+
+def _process_in_worker(recipe_id):
+    close_old_connections()
+    try:
+        process_recipe_image(recipe_id)
+    except Exception:
+        logger.exception('Не удалось обработать изображение %s', recipe_id)
+    finally:
+        close_old_connections()
+
+
+def _encode(image, image_format):
+    if image_format == 'JPEG' and image.mode not in ('RGB', 'L'):
+        image = image.convert('RGB')
+    elif image_format == 'WEBP' and image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA')
+    buffer = BytesIO()
+    image.save(buffer, format=image_format, quality=RECIPE_IMAGE_QUALITY)
+    return ContentFile(buffer.getvalue())
+
+
+@use_primary()
+def process_recipe_image(recipe_id):
+    """
+    Пересохраняет изображение рецепта без метаданных и создаёт
+    уменьшенные варианты в WebP.
+
+    Поля обновляются, только если изображение не заменили
+    за время обработки, иначе новые файлы удаляются. Рецепт читается
+    из основной БД: обработка начинается сразу после записи.
+    """
+    recipe = Recipe.objects.filter(pk=recipe_id).only(
+        'image', *RECIPE_IMAGE_VARIANTS,
+    ).first()
+    if recipe is None or not recipe.image:
+        return False
+
+    source = recipe.image.name
+    with recipe.image.open('rb') as file, Image.open(file) as original:
+        image_format = original.format or 'PNG'
+        image = ImageOps.exif_transpose(original)
+
+    fields = ('image', *RECIPE_IMAGE_VARIANTS)
+    old_files = [getattr(recipe, field).name for field in fields]
+    stem = os.path.splitext(os.path.basename(source))[0]
+    recipe.image.save(
+        os.path.basename(source), _encode(image, image_format), save=False,
+    )
+    sizes = {}
+    for variant, size in RECIPE_IMAGE_VARIANTS.items():
+        resized = image.copy()
+        resized.thumbnail(size)
+        sizes[variant] = resized.size
+        getattr(recipe, variant).save(
+            f'{stem}.webp', _encode(resized, 'WEBP'), save=False,
+        )
+
+    new_files = [getattr(recipe, field).name for field in fields]
+    updated = Recipe.objects.filter(pk=recipe_id, image=source).update(
+        image_width=sizes['image_thumbnail'][0],
+        image_height=sizes['image_thumbnail'][1],
+        **dict(zip(fields, new_files)),
+    )
+    for name in old_files if updated else new_files:
+        if name:
+            recipe.image.storage.delete(name)
+    if updated:
+        invalidate_recipe_cards(recipe_id=recipe_id)
+    return bool(updated)
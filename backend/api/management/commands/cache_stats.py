@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from api.cache import get_counters
+from api.constants import (
+    RESPONSE_CACHE_HITS, RESPONSE_CACHE_MISSES,
+    TOKEN_CACHE_HITS, TOKEN_CACHE_MISSES
+)
+
+
+class Command(BaseCommand):
+    """Вывод счётчиков попаданий и промахов кешей."""
+
+    help = 'Show cache hit and miss counters.'
+    caches = {
+        'Ответы анонимным пользователям': (
+            RESPONSE_CACHE_HITS, RESPONSE_CACHE_MISSES,
+        ),
+        'Токены аутентификации': (TOKEN_CACHE_HITS, TOKEN_CACHE_MISSES),
+    }
+
+    def handle(self, *args, **options):
+        for title, (hits_name, misses_name) in self.caches.items():
+            counters = get_counters((hits_name, misses_name))
+            hits, misses = counters[hits_name], counters[misses_name]
+            total = hits + misses
+            rate = hits / total * 100 if total else 0
+            self.stdout.write(
+                f'{title}: попаданий {hits}, промахов {misses}, '
+                f'доля попаданий {rate:.1f}%'
+            )
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from api.cache import get_counters
+from api.constants import (
+    DB_CONNECTION_WAIT_US, DB_CONNECTIONS, DB_POOL_TIMEOUTS
+)
+
+
+class Command(BaseCommand):
+    """Вывод числа и среднего времени получения соединений с БД."""
+
+    help = 'Show database connection acquisition counters.'
+
+    def handle(self, *args, **options):
+        counters = get_counters(
+            (DB_CONNECTIONS, DB_CONNECTION_WAIT_US, DB_POOL_TIMEOUTS),
+        )
+        connections = counters[DB_CONNECTIONS]
+        wait = counters[DB_CONNECTION_WAIT_US] / 1000
+        average = wait / connections if connections else 0
+        self.stdout.write(
+            f'Соединений с БД: {connections}, '
+            f'среднее время получения {average:.2f} мс, '
+            f'отказов пула по таймауту {counters[DB_POOL_TIMEOUTS]}'
+        )
@@ -0,0 +1,94 @@
+import re
+from time import perf_counter
+from types import SimpleNamespace
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from rest_framework.settings import api_settings
+
+from api.filters import RecipeFilter
+from recipes.models import Recipe, Tag
+
+User = get_user_model()
+
+# Имена индексов в планах SQLite и PostgreSQL.
+INDEX_PATTERN = re.compile(
+    r'(?:USING (?:COVERING )?INDEX|Index (?:Only )?Scan (?:Backward )?using'
+    r'|Bitmap Index Scan on) (\w+)'
+)
+
+
+class Command(BaseCommand):
+    """
+    Планы выполнения частых запросов списка рецептов.
+
+    Для каждого фильтра выводится план первой страницы, индексы,
+    которые в нём используются, и среднее время выполнения.
+    """
+
+    help = 'Explain and time the hot recipe list queries.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user', type=int,
+            help='id пользователя для фильтров избранного и корзины.',
+        )
+        parser.add_argument(
+            '--repeat', type=int, default=20,
+            help='Сколько раз выполнить каждый запрос для замера времени.',
+        )
+        parser.add_argument(
+            '--analyze', action='store_true',
+            help='EXPLAIN ANALYZE, только для PostgreSQL.',
+        )
+
+    def handle(self, *args, **options):
+        if options['analyze'] and connection.vendor != 'postgresql':
+            raise CommandError('--analyze поддерживается только PostgreSQL.')
+        user = self.get_user(options['user'])
+        for title, data in self.get_cases(user).items():
+            queryset = RecipeFilter(
+                data,
+                queryset=Recipe.objects.with_card(user),
+                request=SimpleNamespace(user=user),
+            ).qs.order_by('-pub_date', '-pk')[:api_settings.PAGE_SIZE]
+            plan = (
+                queryset.explain(analyze=True) if options['analyze']
+                else queryset.explain()
+            )
+            used = sorted(set(INDEX_PATTERN.findall(plan)))
+            self.stdout.write(self.style.MIGRATE_HEADING(title))
+            self.stdout.write(plan)
+            self.stdout.write(
+                f'Индексы: {", ".join(used) or "не используются"}; '
+                f'среднее время {self.measure(queryset, options["repeat"])}'
+                ' мс\n'
+            )
+
+    @staticmethod
+    def get_user(pk):
+        user = (
+            User.objects.filter(pk=pk) if pk else User.objects.order_by('pk')
+        ).first()
+        if user is None:
+            raise CommandError('Пользователь не найден.')
+        return user
+
+    @staticmethod
+    def get_cases(user):
+        tags = list(Tag.objects.values_list('slug', flat=True)[:2])
+        return {
+            'Новые рецепты': {},
+            'Рецепты автора': {'author': user.pk},
+            'Рецепты с тегами': {'tags': tags},
+            'Избранное': {'is_favorited': True},
+            'Список покупок': {'is_in_shopping_cart': True},
+        }
+
+    @staticmethod
+    def measure(queryset, repeat):
+        start = perf_counter()
+        for _ in range(max(repeat, 1)):
+            list(queryset._chain())
+        return round((perf_counter() - start) / max(repeat, 1) * 1000, 2)
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+
+from api.images import process_recipe_image
+from recipes.models import Recipe
+
+
+class Command(BaseCommand):
+    """Обработка изображений рецептов, оставшихся без вариантов."""
+
+    help = 'Strip metadata and build image variants for recipes.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='Process every recipe, not only unprocessed ones.',
+        )
+
+    def handle(self, *args, **options):
+        recipes = Recipe.objects.exclude(image='')
+        if not options['all']:
+            recipes = recipes.filter(image_webp='')
+        processed = failed = 0
+        for recipe_id in recipes.values_list('pk', flat=True).iterator():
+            try:
+                processed += process_recipe_image(recipe_id)
+            except Exception as error:
+                failed += 1
+                self.stderr.write(f'Рецепт {recipe_id}: {error}')
+        self.stdout.write(
+            f'Обработано изображений: {processed}, с ошибками: {failed}'
+        )
@@ -0,0 +1,139 @@
+from collections import defaultdict
+from threading import Lock
+
+from api.cache import RECIPE_INGREDIENTS_VERSION, get_version
+from api.routers import use_primary
+from recipes.models import Recipe, RecipeIngredient
+
+
+def _bitset(positions):
+    """Целое число, в котором установлены биты с номерами positions."""
+    buffer = bytearray(max(positions) // 8 + 1)
+    for position in positions:
+        buffer[position >> 3] |= 1 << (position & 7)
+    return int.from_bytes(buffer, 'little')
+
+
+def _add(planes, bitset):
+    """
+    Прибавляет единицу к счётчикам рецептов из bitset.
+
+    Счётчики хранятся по битовым срезам: planes[j] содержит j-й бит
+    счётчика каждого рецепта, поэтому сложение идёт сразу для всех
+    рецептов как у двоичного сумматора.
+    """
+    carry = bitset
+    for j, plane in enumerate(planes):
+        if not carry:
+            return
+        planes[j], carry = plane ^ carry, plane & carry
+    if carry:
+        planes.append(carry)
+
+
+def _equal(planes, value, universe):
+    """Рецепты из universe, счётчик которых равен value."""
+    mask = universe
+    for j, plane in enumerate(planes):
+        mask &= plane if value >> j & 1 else ~plane
+    return mask if value >> len(planes) == 0 else 0
+
+
+def _positions(bitset):
+    """Номера установленных битов по возрастанию."""
+    bits = bin(bitset)[:1:-1]
+    position = bits.find('1')
+    while position != -1:
+        yield position
+        position = bits.find('1', position + 1)
+
+
+class RecipeMatcher:
+    """
+    Подбор рецептов по имеющимся ингредиентам в памяти процесса.
+
+    Для каждого ингредиента хранится битовое множество рецептов,
+    номера битов соответствуют рецептам по убыванию даты публикации.
+    Совпадения считаются побитовыми операциями по всем рецептам сразу.
+    Индекс перечитывается только при смене состава рецептов,
+    их добавлении и удалении, а не при любом изменении рецептов.
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self._version = None
+        self._index = ((), {}, {})
+
+    @use_primary()
+    def _load(self, version):
+        recipe_ids = list(
+            Recipe.objects.order_by('-pub_date', '-pk')
+            .values_list('pk', flat=True)
+        )
+        numbers = {pk: number for number, pk in enumerate(recipe_ids)}
+        postings = defaultdict(list)
+        totals = [0] * len(recipe_ids)
+        rows = RecipeIngredient.objects.values_list(
+            'recipe_id', 'ingredient_id',
+        ).distinct().order_by().iterator()
+        for recipe_id, ingredient_id in rows:
+            number = numbers.get(recipe_id)
+            if number is not None:
+                postings[ingredient_id].append(number)
+                totals[number] += 1
+
+        by_total = defaultdict(list)
+        for number, total in enumerate(totals):
+            by_total[total].append(number)
+        self._index = (
+            tuple(recipe_ids),
+            {pk: _bitset(numbers) for pk, numbers in postings.items()},
+            {total: _bitset(numbers) for total, numbers in by_total.items()},
+        )
+        self._version = version
+
+    def _ensure_loaded(self):
+        version = get_version(RECIPE_INGREDIENTS_VERSION)
+        if version != self._version:
+            with self._lock:
+                if version != self._version:
+                    self._load(version)
+        return self._index
+
+    def match(self, ingredient_ids, max_missing=None):
+        """
+        Рецепты, в которых есть хотя бы один из ингредиентов,
+        в виде (id, совпало, всего). Сначала идут рецепты с большей
+        долей имеющихся ингредиентов, при равной доле — с большим
+        числом совпадений, затем более новые.
+        """
+        recipe_ids, bitsets, by_total = self._ensure_loaded()
+        planes = []
+        candidates = 0
+        for ingredient_id in set(ingredient_ids):
+            bitset = bitsets.get(ingredient_id, 0)
+            candidates |= bitset
+            _add(planes, bitset)
+        if not candidates:
+            return []
+
+        groups = []
+        for total, recipes in by_total.items():
+            universe = recipes & candidates
+            if not universe:
+                continue
+            lowest = 1 if max_missing is None else max(total - max_missing, 1)
+            for matched in range(lowest, total + 1):
+                mask = _equal(planes, matched, universe)
+                if mask:
+                    groups.append((matched / total, matched, total, mask))
+
+        groups.sort(key=lambda group: group[:2], reverse=True)
+        return [
+            (recipe_ids[number], matched, total)
+            for _, matched, total, mask in groups
+            for number in _positions(mask)
+        ]
+
+
+recipe_matcher = RecipeMatcher()
@@ -0,0 +1,94 @@
+from hashlib import md5
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+
+from api.routers import primary_pinned
+
+PRIMARY_STICKY_KEY = 'primary:{}'
+PRIMARY_STICKY_COOKIE = 'primary_db'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+class PrimaryStickinessMiddleware:
+    """
+    Закрепление запросов за основной БД при наличии реплик.
+
+    Небезопасные запросы целиком идут в основную БД. После успешной
+    записи клиент ещё DB_PRIMARY_STICKY_SECONDS читает из неё же,
+    чтобы видеть свои изменения: клиенты с токеном отмечаются в кеше
+    по заголовку Authorization, остальные — cookie.
+    """
+
+    async_capable = True
+    sync_capable = True
+
+    def __init__(self, get_response):
+        if not settings.DATABASE_REPLICAS:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        key = self.get_sticky_key(request)
+        token = primary_pinned.set(self.is_pinned(
+            request, key is not None and cache.get(key),
+        ))
+        try:
+            response = self.get_response(request)
+        finally:
+            primary_pinned.reset(token)
+        if self.is_write(request, response) and key is not None:
+            cache.set(key, True, settings.DB_PRIMARY_STICKY_SECONDS)
+        return self.process_response(request, response)
+
+    async def __acall__(self, request):
+        key = self.get_sticky_key(request)
+        token = primary_pinned.set(self.is_pinned(
+            request, key is not None and await cache.aget(key),
+        ))
+        try:
+            response = await self.get_response(request)
+        finally:
+            primary_pinned.reset(token)
+        if self.is_write(request, response) and key is not None:
+            await cache.aset(key, True, settings.DB_PRIMARY_STICKY_SECONDS)
+        return self.process_response(request, response)
+
+    @staticmethod
+    def get_sticky_key(request):
+        authorization = request.META.get('HTTP_AUTHORIZATION')
+        if not authorization:
+            return None
+        return PRIMARY_STICKY_KEY.format(
+            md5(authorization.encode()).hexdigest(),
+        )
+
+    @staticmethod
+    def is_pinned(request, recently_written):
+        return bool(
+            request.method not in SAFE_METHODS
+            or recently_written
+            or PRIMARY_STICKY_COOKIE in request.COOKIES
+        )
+
+    @staticmethod
+    def is_write(request, response):
+        return (
+            request.method not in SAFE_METHODS
+            and response.status_code < 400
+        )
+
+    def process_response(self, request, response):
+        if self.is_write(request, response):
+            response.set_cookie(
+                PRIMARY_STICKY_COOKIE, '1',
+                max_age=settings.DB_PRIMARY_STICKY_SECONDS,
+                httponly=True, samesite='Lax',
+            )
+        return response
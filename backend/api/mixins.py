@@ -1,4 +1,77 @@
+from hashlib import md5
+
+from django.core.cache import cache
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, quote_etag
 from rest_framework import mixins, viewsets
+from rest_framework.response import Response
+
+from api.cache import (
+    get_last_modified, get_versions, incr_counter, user_version
+)
+from api.constants import (
+    RESPONSE_CACHE_HITS, RESPONSE_CACHE_MISSES, RESPONSE_CACHE_TIMEOUT
+)
+from api.paginators import KeysetLimitPaginator
+from api.routers import pin_primary_after_change
+
+
+def conditional_headers(request, names):
+    """ETag и Last-Modified ответа по версиям данных names."""
+    versions = get_versions(names)
+    fingerprint = '|'.join((
+        *(f'{name}={versions[name]}' for name in names),
+        request.get_full_path(),
+        request.META.get('HTTP_ACCEPT', ''),
+    ))
+    etag = quote_etag(md5(fingerprint.encode()).hexdigest())
+    last_modified = get_last_modified(names)
+    if last_modified is not None:
+        last_modified = int(last_modified)
+    return etag, last_modified
+
+
+def set_conditional_headers(response, etag, last_modified):
+    if response.status_code in (200, 304):
+        response['ETag'] = etag
+        if last_modified is not None:
+            response['Last-Modified'] = http_date(last_modified)
+    patch_vary_headers(response, ('Authorization',))
+
+
+def response_cache_key(request, parts, version_names, query_params):
+    """
+    Ключ закешированного анонимного ответа: части parts, версии
+    version_names и нормализованные параметры запроса. None, если
+    в запросе есть параметры не из query_params.
+    """
+    params = request.GET
+    if not set(params) <= set(query_params):
+        return None
+    normalized = '&'.join(
+        f'{name}={",".join(sorted(params.getlist(name)))}'
+        for name in sorted(params)
+    )
+    fingerprint = '|'.join((
+        request.get_host(),
+        request.META.get('HTTP_ACCEPT', ''),
+        normalized,
+    ))
+    versions = get_versions(version_names)
+    return 'response:{}:{}:{}'.format(
+        ':'.join(str(part) for part in parts),
+        ':'.join(str(versions[name]) for name in version_names),
+        md5(fingerprint.encode()).hexdigest(),
+    )
+
+
+def get_cached_response(key):
+    """Данные закешированного ответа с учётом попаданий и промахов."""
+    data = cache.get(key)
+    incr_counter(
+        RESPONSE_CACHE_HITS if data is not None else RESPONSE_CACHE_MISSES,
+    )
+    return data
 
 
 class CreateListRetrieveViewSet(
@@ -10,3 +83,118 @@ class CreateListRetrieveViewSet(
     """Миксин создания и получения объектов."""
 
     pass
+
+
+class KeysetPaginationMixin:
+    """
+    Миксин постраничного вывода по ключу.
+
+    Включается параметром cursor (пустым для первой страницы),
+    иначе используется обычный pagination_class.
+    """
+
+    keyset_pagination_class = KeysetLimitPaginator
+
+    @property
+    def paginator(self):
+        if not hasattr(self, '_paginator'):
+            if (
+                self.pagination_class is not None
+                and self.keyset_pagination_class.cursor_query_param
+                in self.request.query_params
+            ):
+                self._paginator = self.keyset_pagination_class()
+            else:
+                self._paginator = super().paginator
+        return self._paginator
+
+
+class ConditionalGetMixin:
+    """
+    Миксин условных запросов для list и retrieve.
+
+    ETag и Last-Modified строятся по версиям данных из кеша, поэтому
+    ответ 304 отдаётся без обращения к БД и без сериализации.
+    В version_names перечисляются версии, от которых зависит ответ;
+    user_dependent добавляет версию избранного, корзины и подписок.
+    """
+
+    version_names = ()
+    user_dependent = False
+
+    def get_version_names(self):
+        names = list(self.version_names)
+        if self.user_dependent and self.request.user.is_authenticated:
+            names.append(user_version(self.request.user.pk))
+        return names
+
+    def list(self, request, *args, **kwargs):
+        return self._conditional(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self._conditional(super().retrieve, request, *args, **kwargs)
+
+    def _conditional(self, handler, request, *args, **kwargs):
+        etag, last_modified = conditional_headers(
+            request, self.get_version_names(),
+        )
+        pin_primary_after_change(last_modified)
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified,
+        )
+        if response is None:
+            response = handler(request, *args, **kwargs)
+        set_conditional_headers(response, etag, last_modified)
+        return response
+
+
+class AnonymousResponseCacheMixin:
+    """
+    Миксин кеширования ответов list и retrieve для анонимных запросов.
+
+    Ключ строится из нормализованных параметров cache_query_params
+    и версий cache_version_names, поэтому запись устаревает сама при
+    изменении данных. Запросы с другими параметрами не кешируются.
+    """
+
+    cache_version_names = ()
+    cache_query_params = ()
+
+    def list(self, request, *args, **kwargs):
+        return self._cached(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self._cached(super().retrieve, request, *args, **kwargs)
+
+    def get_response_cache_key(self, request):
+        return response_cache_key(
+            request,
+            (
+                self.basename,
+                self.action,
+                self.kwargs.get(
+                    self.lookup_url_kwarg or self.lookup_field, '',
+                ),
+            ),
+            self.cache_version_names,
+            self.cache_query_params,
+        )
+
+    def _cached(self, handler, request, *args, **kwargs):
+        if request.user.is_authenticated:
+            return handler(request, *args, **kwargs)
+        key = self.get_response_cache_key(request)
+        if key is None:
+            return handler(request, *args, **kwargs)
+
+        data = get_cached_response(key)
+        if data is not None:
+            response = Response(data)
+            response['X-Cache'] = 'HIT'
+            return response
+
+        response = handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            cache.set(key, response.data, RESPONSE_CACHE_TIMEOUT)
+        response['X-Cache'] = 'MISS'
+        return response
@@ -1,5 +1,188 @@
-from rest_framework.pagination import PageNumberPagination
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+
+from django.core.cache import cache
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import (
+    BasePagination, PageNumberPagination, _positive_int
+)
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+from api.constants import FEED_TIMELINE_SIZE, FEED_TIMELINE_TIMEOUT
 
 
 class PageNumberLimitPaginator(PageNumberPagination):
     page_size_query_param = 'limit'
+
+
+class KeysetLimitPaginator(BasePagination):
+    """
+    Постраничный вывод по ключу сортировки без COUNT и OFFSET.
+
+    Ключ берётся из сортировки набора запросов и дополняется id,
+    поэтому для рецептов это (pub_date, id). Следующая страница
+    выбирается условием по ключу последней записи, и её стоимость
+    не зависит от глубины прокрутки.
+    """
+
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'limit'
+    page_size = api_settings.PAGE_SIZE
+    invalid_cursor_message = 'Неверный курсор.'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.limit = self.get_limit(request)
+        self.ordering = self.get_ordering(queryset)
+
+        queryset = queryset.order_by(*self.ordering)
+        position = self.decode_cursor(request, queryset)
+        queryset = self.get_page_queryset(queryset, position)
+
+        results = list(queryset[:self.limit + 1])
+        self.has_next = len(results) > self.limit
+        self.page = results[:self.limit]
+        return self.page
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {
+                    'type': 'string',
+                    'nullable': True,
+                    'format': 'uri',
+                },
+                'results': schema,
+            },
+        }
+
+    def get_page_queryset(self, queryset, position):
+        """Записи после позиции курсора."""
+        if position is None:
+            return queryset
+        return queryset.filter(self.get_position_filter(position))
+
+    def get_limit(self, request):
+        try:
+            return _positive_int(
+                request.query_params[self.page_size_query_param],
+                strict=True,
+            )
+        except (KeyError, ValueError):
+            return self.page_size
+
+    def get_ordering(self, queryset):
+        """Сортировка набора запросов с id для однозначности ключа."""
+        ordering = list(
+            queryset.query.order_by or queryset.model._meta.ordering
+        )
+        if not {'pk', '-pk', 'id', '-id'} & set(ordering):
+            descending = bool(ordering) and ordering[0].startswith('-')
+            ordering.append('-pk' if descending else 'pk')
+        return ordering
+
+    def get_position_filter(self, position):
+        """
+        Условие «строго после позиции» для составного ключа:
+        (a < x) или (a = x и b < y) и так далее.
+        """
+        condition = Q()
+        equal = Q()
+        for field, value in zip(self.ordering, position):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            condition |= equal & Q(**{f'{name}__{lookup}': value})
+            equal &= Q(**{name: value})
+        return condition
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        last = self.page[-1]
+        position = [
+            str(getattr(last, field.lstrip('-'))) for field in self.ordering
+        ]
+        encoded = urlsafe_b64encode(json.dumps(position).encode()).decode()
+        return replace_query_param(
+            self.request.build_absolute_uri(),
+            self.cursor_query_param,
+            encoded,
+        )
+
+    def decode_cursor(self, request, queryset):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            position = json.loads(urlsafe_b64decode(encoded.encode()))
+            if len(position) != len(self.ordering):
+                raise ValueError
+            return [
+                self._to_python(queryset, field.lstrip('-'), value)
+                for field, value in zip(self.ordering, position)
+            ]
+        except (TypeError, ValueError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    @staticmethod
+    def _to_python(queryset, name, value):
+        annotation = queryset.query.annotations.get(name)
+        if annotation is not None:
+            return annotation.output_field.to_python(value)
+        meta = queryset.model._meta
+        try:
+            field = meta.pk if name == 'pk' else meta.get_field(name)
+        except FieldDoesNotExist:
+            return value
+        return field.to_python(value)
+
+
+class TimelineKeysetPaginator(KeysetLimitPaginator):
+    """
+    Постраничный вывод ленты с закешированным началом.
+
+    Ключи первых FEED_TIMELINE_SIZE записей хранятся в кеше под
+    timeline_key, и страница в их пределах выбирается по id.
+    Дальше ленты в кеше страницы строятся обычным запросом по ключу.
+    Все поля сортировки должны быть по убыванию.
+    """
+
+    timeline_key = None
+
+    def get_page_queryset(self, queryset, position):
+        timeline = self.get_timeline(queryset)
+        if timeline is None:
+            return super().get_page_queryset(queryset, position)
+        complete = len(timeline) < FEED_TIMELINE_SIZE
+        if position is not None:
+            position = tuple(position)
+            timeline = [entry for entry in timeline if entry < position]
+        if len(timeline) <= self.limit and not complete:
+            return super().get_page_queryset(queryset, position)
+        return queryset.filter(
+            pk__in=[entry[-1] for entry in timeline[:self.limit + 1]],
+        )
+
+    def get_timeline(self, queryset):
+        if self.timeline_key is None or not all(
+            field.startswith('-') for field in self.ordering
+        ):
+            return None
+        timeline = cache.get(self.timeline_key)
+        if timeline is None:
+            timeline = list(queryset.values_list(
+                *(field.lstrip('-') for field in self.ordering),
+            )[:FEED_TIMELINE_SIZE])
+            cache.set(self.timeline_key, timeline, FEED_TIMELINE_TIMEOUT)
+        return timeline
@@ -0,0 +1,63 @@
+import time
+from threading import Lock
+
+from django.db.backends.postgresql import base
+
+from api.postgresql.pool import ConnectionPool, PoolTimeout, connection_stats
+
+_pools = {}
+_pools_lock = Lock()
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """
+    PostgreSQL с замером времени получения соединения
+    и необязательным пулом соединений процесса.
+
+    Пул включается параметром POOL_SIZE в настройках БД. Тогда
+    закрытие соединения в конце запроса возвращает его в пул,
+    а не разрывает.
+    """
+
+    def get_pool(self):
+        size = self.settings_dict.get('POOL_SIZE')
+        if not size:
+            return None
+        # Тестовый прогон меняет NAME: соединения к разным БД не смешиваются.
+        key = (self.alias, self.settings_dict['NAME'])
+        with _pools_lock:
+            if key not in _pools:
+                _pools[key] = ConnectionPool(
+                    size, self.settings_dict.get('POOL_TIMEOUT', 10),
+                )
+            return _pools[key]
+
+    def get_new_connection(self, conn_params):
+        start = time.monotonic()
+        timed_out = False
+        pool = self.get_pool()
+        try:
+            if pool is None:
+                return super().get_new_connection(conn_params)
+            connection, self.isolation_level = pool.acquire(
+                lambda: self._connect_for_pool(conn_params),
+            )
+            return connection
+        except PoolTimeout:
+            timed_out = True
+            raise
+        finally:
+            connection_stats.record(time.monotonic() - start, timed_out)
+
+    def _connect_for_pool(self, conn_params):
+        connection = super().get_new_connection(conn_params)
+        return connection, self.isolation_level
+
+    def _close(self):
+        pool = self.get_pool()
+        if pool is None or self.connection is None:
+            return super()._close()
+        usable = not self.connection.closed and (
+            not self.errors_occurred or self.is_usable()
+        )
+        pool.release((self.connection, self.isolation_level), usable)
@@ -0,0 +1,121 @@
+import atexit
+import queue
+import time
+from threading import BoundedSemaphore, Lock
+
+from django.db import OperationalError
+
+from api.cache import incr_counter
+from api.constants import (
+    DB_CONNECTION_WAIT_US, DB_CONNECTIONS, DB_POOL_CHECK_INTERVAL,
+    DB_POOL_TIMEOUTS, DB_STATS_FLUSH, DB_STATS_FLUSH_INTERVAL
+)
+
+
+class ConnectionStats:
+    """
+    Счётчики получения соединений процесса.
+
+    Время ожидания копится локально и переносится в общие счётчики
+    пачками, чтобы не обращаться к кешу на каждое соединение: после
+    DB_STATS_FLUSH соединений, не реже раза в DB_STATS_FLUSH_INTERVAL
+    секунд, сразу при отказе пула и при завершении процесса.
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self._stats = dict.fromkeys(
+            (DB_CONNECTIONS, DB_CONNECTION_WAIT_US, DB_POOL_TIMEOUTS), 0,
+        )
+        self._flushed = time.monotonic()
+
+    def record(self, wait, timed_out=False):
+        with self._lock:
+            self._stats[DB_CONNECTIONS] += 1
+            self._stats[DB_CONNECTION_WAIT_US] += int(wait * 1_000_000)
+            self._stats[DB_POOL_TIMEOUTS] += timed_out
+            if (
+                timed_out
+                or self._stats[DB_CONNECTIONS] >= DB_STATS_FLUSH
+                or time.monotonic() - self._flushed
+                >= DB_STATS_FLUSH_INTERVAL
+            ):
+                self._flush()
+
+    def flush(self):
+        with self._lock:
+            self._flush()
+
+    def _flush(self):
+        for stat, value in self._stats.items():
+            if value:
+                incr_counter(stat, value)
+        self._stats = dict.fromkeys(self._stats, 0)
+        self._flushed = time.monotonic()
+
+
+class PoolTimeout(OperationalError):
+    """Все соединения пула заняты дольше допустимого."""
+
+
+class ConnectionPool:
+    """
+    Пул соединений процесса с ограничением размера.
+
+    Когда все соединения заняты, запрос ждёт освобождения не дольше
+    timeout и получает OperationalError. Соединение, простоявшее
+    дольше DB_POOL_CHECK_INTERVAL, проверяется перед выдачей.
+    """
+
+    def __init__(self, size, timeout):
+        self.timeout = timeout
+        self._slots = BoundedSemaphore(size)
+        self._idle = queue.LifoQueue()
+
+    def acquire(self, connect):
+        if not self._slots.acquire(timeout=self.timeout):
+            raise PoolTimeout(
+                f'Нет свободного соединения с БД за {self.timeout} с.'
+            )
+        try:
+            while True:
+                try:
+                    entry, released = self._idle.get_nowait()
+                except queue.Empty:
+                    return connect()
+                if self._is_usable(entry[0], released):
+                    return entry
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def release(self, entry, usable=True):
+        try:
+            if usable:
+                # Незавершённая транзакция не переходит к другому запросу.
+                entry[0].rollback()
+                self._idle.put((entry, time.monotonic()))
+            else:
+                entry[0].close()
+        except Exception:
+            entry[0].close()
+        finally:
+            self._slots.release()
+
+    @staticmethod
+    def _is_usable(connection, released):
+        if connection.closed:
+            return False
+        if time.monotonic() - released < DB_POOL_CHECK_INTERVAL:
+            return True
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT 1')
+        except Exception:
+            connection.close()
+            return False
+        return True
+
+
+connection_stats = ConnectionStats()
+atexit.register(connection_stats.flush)
@@ -0,0 +1,69 @@
+from threading import Lock
+
+from asgiref.sync import sync_to_async
+
+from api.cache import TAGS_VERSION, get_version
+from api.routers import use_primary
+from recipes.models import Tag
+
+
+class TagRegistry:
+    """
+    Теги в памяти процесса.
+
+    Список тегов перечитывается из БД только при смене общей версии
+    тегов, которую меняют сигналы сохранения и удаления Tag.
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self._version = None
+        self._index = ((), {}, {})
+
+    def _ensure_loaded(self):
+        version = get_version(TAGS_VERSION)
+        if version != self._version:
+            with self._lock:
+                if version != self._version:
+                    with use_primary():
+                        self._set(tuple(Tag.objects.all()), version)
+        return self._index
+
+    async def _aensure_loaded(self):
+        """Вариант _ensure_loaded для асинхронных представлений."""
+        version = await sync_to_async(get_version)(TAGS_VERSION)
+        if version != self._version:
+            with use_primary():
+                tags = tuple([tag async for tag in Tag.objects.all()])
+            with self._lock:
+                self._set(tags, version)
+        return self._index
+
+    def _set(self, tags, version):
+        self._index = (
+            tags,
+            {tag.pk: tag for tag in tags},
+            {tag.slug: tag for tag in tags},
+        )
+        self._version = version
+
+    def all(self):
+        return self._ensure_loaded()[0]
+
+    def get(self, pk):
+        return self._ensure_loaded()[1].get(pk)
+
+    def get_by_slug(self, slug):
+        return self._ensure_loaded()[2].get(slug)
+
+    async def aall(self):
+        return (await self._aensure_loaded())[0]
+
+    async def aget(self, pk):
+        return (await self._aensure_loaded())[1].get(pk)
+
+    def slug_choices(self):
+        return [(tag.slug, tag.name) for tag in self.all()]
+
+
+tag_registry = TagRegistry()
@@ -0,0 +1,62 @@
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+
+PRIMARY_DATABASE = 'default'
+# Токены читаются сразу после входа, отставание реплики недопустимо.
+PRIMARY_ONLY_MODELS = ('authtoken.token',)
+
+primary_pinned = ContextVar('primary_pinned', default=False)
+
+
+@contextmanager
+def use_primary():
+    """Все чтения внутри блока идут в основную БД."""
+    token = primary_pinned.set(True)
+    try:
+        yield
+    finally:
+        primary_pinned.reset(token)
+
+
+def pin_primary_after_change(last_modified):
+    """
+    Закрепляет текущий запрос за основной БД, если данные изменились
+    только что: реплика могла ещё не получить изменение, а ответ
+    закешируется под новой версией.
+    """
+    if (
+        settings.DATABASE_REPLICAS
+        and last_modified is not None
+        and time.time() - last_modified < settings.DB_PRIMARY_STICKY_SECONDS
+    ):
+        primary_pinned.set(True)
+
+
+class PrimaryReplicaRouter:
+    """
+    Запись в основную БД, чтение из случайной реплики.
+
+    Чтение остаётся в основной БД, если запрос закреплён за ней:
+    небезопасные методы, недавняя запись того же клиента
+    и блоки use_primary.
+    """
+
+    def db_for_read(self, model, **hints):
+        if (
+            not settings.DATABASE_REPLICAS
+            or primary_pinned.get()
+            or model._meta.label_lower in PRIMARY_ONLY_MODELS
+        ):
+            return PRIMARY_DATABASE
+        return random.choice(settings.DATABASE_REPLICAS)
+
+    def db_for_write(self, model, **hints):
+        return PRIMARY_DATABASE
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Реплики содержат те же данные, что и основная БД.
+        return True
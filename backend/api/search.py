@@ -0,0 +1,92 @@
+from collections import defaultdict
+
+from django.contrib.postgres.search import (
+    SearchQuery, SearchRank, SearchVector
+)
+from django.db import connections
+from django.db.models import Case, F, FloatField, TextField, Value, When
+from django.db.models.functions import Cast, Length, StrIndex
+from django.db.models.lookups import LessThanOrEqual
+
+from api.constants import SEARCH_CONFIG, SEARCH_MAX_TERMS
+from recipes.models import Recipe, RecipeIngredient
+
+
+def _vector(value, weight):
+    return SearchVector(
+        Value(value, output_field=TextField()),
+        weight=weight,
+        config=SEARCH_CONFIG,
+    )
+
+
+def update_search_documents(**lookups):
+    """
+    Пересобирает поисковые документы рецептов пакетно: название,
+    ингредиенты и описание. В PostgreSQL заодно обновляется
+    взвешенный tsvector, индексируемый GIN.
+    """
+    recipes = list(Recipe.objects.filter(**lookups).only('name', 'text'))
+    if not recipes:
+        return
+    ingredients = defaultdict(list)
+    rows = RecipeIngredient.objects.filter(
+        recipe__in=recipes,
+    ).values_list('recipe_id', 'ingredient__name')
+    for recipe_id, name in rows:
+        ingredients[recipe_id].append(name)
+
+    fields = ['search_document']
+    postgres = connections[Recipe.objects.db].vendor == 'postgresql'
+    if postgres:
+        fields.append('search_vector')
+    for recipe in recipes:
+        names = ' '.join(ingredients[recipe.pk])
+        recipe.search_document = '\n'.join(
+            (recipe.name, names, recipe.text)
+        ).lower()
+        if postgres:
+            recipe.search_vector = (
+                _vector(recipe.name, 'A')
+                + _vector(names, 'B')
+                + _vector(recipe.text, 'C')
+            )
+    Recipe.objects.bulk_update(recipes, fields)
+
+
+def search_recipes(queryset, value):
+    """
+    Рецепты, подходящие под поисковый запрос, по убыванию
+    релевантности. В PostgreSQL используется tsvector, в остальных
+    СУБД совпадения ищутся в поисковом документе, и совпадение
+    в названии ценится выше.
+    """
+    if connections[queryset.db].vendor == 'postgresql':
+        query = SearchQuery(
+            value, config=SEARCH_CONFIG, search_type='websearch',
+        )
+        # ts_rank возвращает real: в курсоре постраничного вывода
+        # значение сравнивается как double precision без потери точности.
+        return queryset.filter(search_vector=query).annotate(
+            rank=Cast(SearchRank(F('search_vector'), query), FloatField()),
+        ).order_by('-rank', '-pub_date')
+
+    terms = value.lower().split()[:SEARCH_MAX_TERMS]
+    if not terms:
+        return queryset
+    # Название стоит в начале документа, поэтому первое вхождение
+    # в пределах его длины означает совпадение в названии.
+    rank = Value(0.0)
+    for term in terms:
+        queryset = queryset.filter(search_document__contains=term)
+        rank += Case(
+            When(
+                LessThanOrEqual(
+                    StrIndex('search_document', Value(term)), Length('name'),
+                ),
+                then=Value(1.0),
+            ),
+            default=Value(0.1),
+            output_field=FloatField(),
+        )
+    return queryset.annotate(rank=rank).order_by('-rank', '-pub_date')
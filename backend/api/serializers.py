@@ -1,14 +1,37 @@
 import re
+from collections import defaultdict
 
 from django.core.exceptions import ValidationError
-from django.shortcuts import get_object_or_404
+from django.db import transaction
+from django.db.models import F, Window
+from django.db.models.functions import RowNumber
 from djoser.serializers import UserCreateSerializer, UserSerializer
 from drf_base64.fields import Base64ImageField
 from rest_framework import serializers
+from rest_framework.exceptions import NotFound
 
-from api.constants import MIN_AMOUNT, MIN_COOKING_TIME
+from api.cache import (
+    FAVORITES_VERSION, RECIPE_INGREDIENTS_VERSION, bump_version, user_version
+)
+from api.cards import (
+    LIVE_FIELDS, invalidate_recipe_cards, refresh_recipe_cards
+)
+from api.constants import (
+    BULK_MAX_ITEMS, MATCH_MAX_INGREDIENTS, MIN_AMOUNT, MIN_COOKING_TIME,
+    RECIPE_IMAGE_VARIANTS, SUBSCRIPTION_RECIPES_MAX_LIMIT
+)
+from api.images import image_dimensions, schedule_image_processing
+from api.registry import tag_registry
+from api.search import update_search_documents
+from api.signals import batch_recipe_ingredients
+from api.utils import (
+    apply_shopping_cart_deltas, change_counter, change_counters,
+    delete_links, insert_link, insert_links, negate_ingredient_amounts,
+    recipe_ingredient_amounts, recipes_ingredient_deltas,
+    update_shopping_carts_for_recipe
+)
 from recipes.models import (
-    Favorite, Ingredient, RecipeIngredient,
+    Favorite, Ingredient, RecipeCard, RecipeIngredient,
     Recipe, ShoppingCart, Tag
 )
 from users.models import Follow, User
@@ -25,6 +48,9 @@ class UserReadSerializer(UserSerializer):
                   'first_name', 'last_name', 'is_subscribed')
 
     def get_is_subscribed(self, obj):
+        if hasattr(obj, 'is_subscribed'):
+            return obj.is_subscribed
+
         request = self.context.get('request')
         user = request.user if request else None
 
@@ -73,10 +99,28 @@ class TagSerializer(serializers.ModelSerializer):
         fields = ('id', 'name', 'color', 'slug')
 
 
+class RecipeImageField(serializers.Field):
+    """Ссылка на вариант изображения рецепта, подходящий для вывода."""
+
+    def __init__(self, variant, **kwargs):
+        self.variant = variant
+        kwargs.update(source='*', read_only=True)
+        super().__init__(**kwargs)
+
+    def to_representation(self, recipe):
+        image = recipe.image_variant(self.variant)
+        if not image:
+            return None
+        request = self.context.get('request')
+        if request is None:
+            return image.url
+        return request.build_absolute_uri(image.url)
+
+
 class ShortRecipesShowSerializer(serializers.ModelSerializer):
     """Сериализатор краткого вывода рецептов."""
 
-    image = Base64ImageField(required=True, allow_null=False)
+    image = RecipeImageField('image_thumbnail')
 
     class Meta:
         model = Recipe
@@ -84,6 +128,8 @@ class ShortRecipesShowSerializer(serializers.ModelSerializer):
             'id',
             'name',
             'image',
+            'image_width',
+            'image_height',
             'cooking_time',
         )
 
@@ -94,7 +140,7 @@ class GetRecipeIngredienterializer(serializers.ModelSerializer):
     id = serializers.IntegerField(source='ingredient.id')
     name = serializers.ReadOnlyField(source='ingredient.name')
     measurement_unit = serializers.ReadOnlyField(
-        source='ingredients.measurement_unit',
+        source='ingredient.measurement_unit',
     )
 
     class Meta:
@@ -118,7 +164,7 @@ class GetRecipeSerializer(serializers.ModelSerializer):
     )
     is_favorited = serializers.BooleanField(read_only=True)
     is_in_shopping_cart = serializers.BooleanField(read_only=True)
-    image = Base64ImageField(required=True, allow_null=False)
+    image = RecipeImageField('image_webp')
 
     class Meta:
         model = Recipe
@@ -129,6 +175,7 @@ class GetRecipeSerializer(serializers.ModelSerializer):
             'ingredients',
             'is_favorited',
             'is_in_shopping_cart',
+            'favorites_count',
             'name',
             'image',
             'text',
@@ -136,6 +183,95 @@ class GetRecipeSerializer(serializers.ModelSerializer):
         )
 
 
+class RecipeCardListSerializer(serializers.ListSerializer):
+    """
+    Вывод страницы рецептов с пакетной сборкой недостающих карточек.
+
+    Рецепт, который прочитан с реплики, но уже удалён в основной БД,
+    карточки не получает и в вывод не попадает.
+    """
+
+    def to_representation(self, data):
+        recipes = list(data)
+        missing = [
+            recipe.pk for recipe in recipes
+            if not _has_card(recipe)
+        ]
+        if missing:
+            cards = refresh_recipe_cards(missing)
+            for recipe in recipes:
+                if recipe.pk in cards:
+                    recipe.card = cards[recipe.pk]
+        return [
+            self.child.to_representation(recipe) for recipe in recipes
+            if _has_card(recipe)
+        ]
+
+
+class RecipeCardSerializer(serializers.BaseSerializer):
+    """
+    Вывод рецепта из предрассчитанной карточки
+    с флагами текущего пользователя.
+    """
+
+    class Meta:
+        list_serializer_class = RecipeCardListSerializer
+
+    def to_representation(self, instance):
+        if not _has_card(instance):
+            card = refresh_recipe_cards([instance.pk]).get(instance.pk)
+            if card is None:
+                # Рецепт прочитан с реплики, но удалён в основной БД.
+                raise NotFound
+            instance.card = card
+        data = dict(instance.card.data)
+        data['author'] = {
+            **data['author'], 'is_subscribed': instance.is_subscribed,
+        }
+        for field in LIVE_FIELDS:
+            data[field] = getattr(instance, field)
+
+        data['image'] = data.get(
+            self.context.get('card_image', 'image'), data['image'],
+        )
+        request = self.context.get('request')
+        if request is not None and data['image']:
+            data['image'] = request.build_absolute_uri(data['image'])
+        return {
+            field: data[field] for field in GetRecipeSerializer.Meta.fields
+        }
+
+
+class RecipeMatchSerializer(serializers.Serializer):
+    """Параметры подбора рецептов по имеющимся ингредиентам."""
+
+    ingredients = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=MATCH_MAX_INGREDIENTS,
+    )
+    max_missing = serializers.IntegerField(min_value=0, required=False)
+
+    def to_internal_value(self, data):
+        # Принимаются и повторяющиеся параметры, и список через запятую.
+        return super().to_internal_value({
+            'ingredients': [
+                value
+                for values in data.getlist('ingredients')
+                for value in values.split(',') if value
+            ],
+            **({'max_missing': data['max_missing']}
+               if 'max_missing' in data else {}),
+        })
+
+
+def _has_card(recipe):
+    try:
+        return recipe.card is not None
+    except RecipeCard.DoesNotExist:
+        return False
+
+
 class AddRecipeIngredienterializer(serializers.ModelSerializer):
     """Сериализатор добавления ингредиентов в рецепт."""
 
@@ -156,11 +292,23 @@ class AddRecipeIngredienterializer(serializers.ModelSerializer):
         return value
 
 
+class TagPrimaryKeyField(serializers.PrimaryKeyRelatedField):
+    """Поле тега по id, проверяемое по тегам в памяти процесса."""
+
+    def to_internal_value(self, data):
+        try:
+            tag = tag_registry.get(int(data))
+        except (TypeError, ValueError):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        if tag is None:
+            self.fail('does_not_exist', pk_value=data)
+        return tag
+
+
 class RecipeCreateAndUpdateSerializer(serializers.ModelSerializer):
     """Сериализатор создания и обновления рецептов."""
 
-    tags = serializers.PrimaryKeyRelatedField(many=True,
-                                              queryset=Tag.objects.all())
+    tags = TagPrimaryKeyField(many=True, queryset=Tag.objects.all())
     ingredients = AddRecipeIngredienterializer(many=True)
     image = Base64ImageField(required=True, allow_null=False)
 
@@ -199,14 +347,21 @@ class RecipeCreateAndUpdateSerializer(serializers.ModelSerializer):
             ingredients.append(recipe_ingredient)
 
         RecipeIngredient.objects.bulk_create(ingredients)
+        # bulk_create не отправляет сигналы сохранения.
+        bump_version(RECIPE_INGREDIENTS_VERSION)
 
+    @transaction.atomic
     def create(self, validated_data):
         ingredients_data = validated_data.pop('ingredients')
         tags = validated_data.pop('tags')
         author = self.context['request'].user
+        validated_data.update(image_dimensions(validated_data['image']))
         recipe = Recipe.objects.create(author=author, **validated_data)
         self.add_ingredients(recipe, ingredients_data)
         recipe.tags.set(tags)
+        update_search_documents(pk=recipe.pk)
+        refresh_recipe_cards([recipe.pk])
+        schedule_image_processing(recipe.pk)
         return recipe
 
     def to_representation(self, instance):
@@ -214,99 +369,236 @@ class RecipeCreateAndUpdateSerializer(serializers.ModelSerializer):
             'request': self.context.get('request')
         }).data
 
-    def update(self, instance, validated_data):
-        ingredients = validated_data.pop('ingredients', [])
-        tags = validated_data.pop('tags')
-        RecipeIngredient.objects.filter(recipe=instance).delete()
-        self.add_ingredients(instance, ingredients)
-        instance.tags.set(tags)
-        return super().update(instance, validated_data)
-
-
-class SubscriptionSerializer(serializers.ModelSerializer):
-    """Сериализатор подписки пользователя."""
-
-    class Meta:
-        model = Follow
-        fields = ('user', 'author')
+    def update_ingredients(self, recipe, ingredients_data):
+        """
+        Приводит ингредиенты рецепта к новому списку: меняются только
+        отличающиеся строки. Возвращает прежние количества, если
+        что-то изменилось, иначе None.
+        """
+        existing = defaultdict(list)
+        old_amounts = {}
+        rows = RecipeIngredient.objects.filter(
+            recipe=recipe,
+        ).select_related('ingredient')
+        for row in rows:
+            existing[row.ingredient_id].append(row)
+            name, unit, total = old_amounts.get(row.ingredient_id, (
+                row.ingredient.name, row.ingredient.measurement_unit, 0,
+            ))
+            old_amounts[row.ingredient_id] = (name, unit, total + row.amount)
+
+        to_create, to_update = [], []
+        for ingredient_data in ingredients_data:
+            ingredient = ingredient_data['id']
+            amount = ingredient_data['amount']
+            if existing[ingredient.pk]:
+                row = existing[ingredient.pk].pop()
+                if row.amount != amount:
+                    row.amount = amount
+                    to_update.append(row)
+            else:
+                to_create.append(RecipeIngredient(
+                    recipe=recipe, ingredient=ingredient, amount=amount,
+                ))
+        to_delete = [row.pk for rows in existing.values() for row in rows]
+        if not (to_create or to_update or to_delete):
+            return None
 
-    def create(self, validated_data):
-        user = validated_data['user']
-        author = validated_data['author']
+        with batch_recipe_ingredients():
+            if to_delete:
+                RecipeIngredient.objects.filter(pk__in=to_delete).delete()
+            RecipeIngredient.objects.bulk_update(to_update, ('amount',))
+            RecipeIngredient.objects.bulk_create(to_create)
+        # Поисковый документ и карточку update обновляет один раз.
+        bump_version(RECIPE_INGREDIENTS_VERSION)
+        return old_amounts
 
-        Follow.objects.create(user=user, author=author)
-        return {'success': True}
+    @transaction.atomic
+    def update(self, instance, validated_data):
+        ingredients = validated_data.pop('ingredients', None)
+        tags = validated_data.pop('tags', None)
+        old_amounts = None
+        if ingredients is not None:
+            old_amounts = self.update_ingredients(instance, ingredients)
+            if old_amounts is not None:
+                update_shopping_carts_for_recipe(instance.pk, old_amounts)
+        if tags is not None and (
+            {tag.pk for tag in tags}
+            != {tag.pk for tag in instance.tags.all()}
+        ):
+            instance.tags.set(tags)
+        if 'image' in validated_data:
+            validated_data.update(image_dimensions(validated_data['image']))
+            # Варианты прежнего изображения больше не подходят:
+            # до обработки выводится новое исходное.
+            validated_data.update(dict.fromkeys(RECIPE_IMAGE_VARIANTS, ''))
+        for field, value in validated_data.items():
+            setattr(instance, field, value)
+        # Только изменённые поля: в загруженном объекте могут быть имена
+        # файлов, которые обработчик изображений уже заменил и удалил.
+        if validated_data:
+            instance.save(update_fields=validated_data)
+        elif old_amounts is not None:
+            # Без сохранения recipe_saved не вызывается.
+            update_search_documents(pk=instance.pk)
+            invalidate_recipe_cards(recipe=instance)
+        refresh_recipe_cards([instance.pk])
+        if 'image' in validated_data:
+            schedule_image_processing(instance.pk)
+        return instance
+
+
+class SubscriptionSerializer(serializers.Serializer):
+    """
+    Сериализатор подписки пользователя.
+
+    Подписка и отписка выполняются одним запросом каждая,
+    повторная подписка определяется по числу изменённых строк.
+    """
+
+    user = serializers.IntegerField()
+    author = serializers.IntegerField()
 
     def validate(self, data):
-        user = data.get('user')
-        author = data.get('author')
-
-        if user == author:
+        if data['user'] == data['author']:
             raise serializers.ValidationError(
                 'Нельзя подписаться на самого себя.'
             )
+        return data
 
-        if user.following.filter(author=author).exists():
+    @transaction.atomic
+    def create(self, validated_data):
+        user = validated_data['user']
+        author = validated_data['author']
+        if not insert_link(Follow, user, 'author', author):
+            if not User.objects.filter(pk=author).exists():
+                raise NotFound('Пользователь не найден.')
             raise serializers.ValidationError(
                 'Вы уже подписаны на этого пользователя.'
             )
-        return data
+        change_counter(User, author, 'followers_count', 1)
+        bump_version(user_version(user))
+        return {'success': True}
+
+    @transaction.atomic
+    def delete(self, data):
+        user = data['user']
+        author = data['author']
+        deleted, _ = Follow.objects.filter(user=user, author=author).delete()
+        if not deleted:
+            raise NotFound('Подписка не найдена.')
+        change_counter(User, author, 'followers_count', -1)
+        bump_version(user_version(user))
+        return deleted
+
+
+class SubscriptionListSerializer(serializers.ListSerializer):
+    """
+    Вывод страницы подписок: последние рецепты всех авторов страницы
+    выбираются одним запросом с нумерацией строк внутри автора.
+    """
+
+    def to_representation(self, data):
+        authors = list(data)
+        limit = self.child.get_recipes_limit(self.context.get('request'))
+        recipes = {author.pk: [] for author in authors}
+        rows = Recipe.objects.annotate(
+            row_number=Window(
+                RowNumber(),
+                partition_by=F('author_id'),
+                order_by=('-pub_date', '-pk'),
+            ),
+        ).filter(
+            author_id__in=recipes, row_number__lte=limit,
+        ).only(
+            'author_id', *ShortRecipesShowSerializer.Meta.fields,
+            *RECIPE_IMAGE_VARIANTS,
+        ).order_by('author_id', 'row_number')
+        for recipe in rows:
+            recipes[recipe.author_id].append(recipe)
+        for author in authors:
+            author.short_recipes = recipes[author.pk]
+        return super().to_representation(authors)
+
+
+class UserProfileSerializer(UserReadSerializer):
+    """Сериализатор профиля пользователя со счётчиками."""
+
+    class Meta(UserReadSerializer.Meta):
+        fields = UserReadSerializer.Meta.fields + (
+            'recipes_count', 'followers_count',
+        )
 
 
-class SubscriptionShowSerializer(UserReadSerializer):
+class SubscriptionShowSerializer(UserProfileSerializer):
     """Сериализатор просмотра подписок пользователя."""
 
-    recipes_count = serializers.IntegerField(
-        source='recipes.count',
-        read_only=True,
-    )
     recipes = serializers.SerializerMethodField(read_only=True)
 
-    class Meta(UserReadSerializer):
-        model = User
-        fields = UserReadSerializer.Meta.fields + (
-            'is_subscribed', 'recipes', 'recipes_count',
-        )
+    class Meta(UserProfileSerializer.Meta):
+        fields = UserProfileSerializer.Meta.fields + ('recipes',)
+        list_serializer_class = SubscriptionListSerializer
 
     def get_recipes(self, obj):
         request = self.context.get('request')
-        recipes_limit = self._get_recipes_limit(request)
-        recipes = obj.recipes.all()[:recipes_limit]
-        context = {'request': request}
+        if hasattr(obj, 'short_recipes'):
+            recipes = obj.short_recipes
+        else:
+            recipes = obj.recipes.all()[:self.get_recipes_limit(request)]
         return ShortRecipesShowSerializer(
-            recipes, many=True, context=context).data
+            recipes, many=True, context={'request': request},
+        ).data
 
-    def _get_recipes_limit(self, request):
-        recipes_limit = request.query_params.get('recipes_limit')
+    @staticmethod
+    def get_recipes_limit(request):
         try:
-            return int(recipes_limit) if recipes_limit else None
-        except ValueError:
-            return None
+            recipes_limit = int(request.query_params['recipes_limit'])
+        except (AttributeError, KeyError, TypeError, ValueError):
+            return SUBSCRIPTION_RECIPES_MAX_LIMIT
+        return min(max(recipes_limit, 0), SUBSCRIPTION_RECIPES_MAX_LIMIT)
 
 
-class BaseItemOperationSerializer(serializers.ModelSerializer):
-    """Базовый сериализатор для операций с элементами списка."""
+class BaseItemOperationSerializer(serializers.Serializer):
+    """
+    Базовый сериализатор для операций с элементами списка.
 
-    def validate(self, data):
-        user = data.get('user')
-        recipe = data.get('recipe')
-        if self.Meta.model.objects.filter(recipe=recipe, user=user).exists():
-            raise serializers.ValidationError(
-                'Рецепт уже добавлен в этот список.'
-            )
-        return data
+    Добавление и удаление выполняются одним запросом каждое,
+    повтор и отсутствие записи определяются по числу строк.
+    """
 
+    user = serializers.IntegerField()
+    recipe = serializers.IntegerField()
+
+    @transaction.atomic
     def create(self, validated_data):
         recipe = validated_data['recipe']
         user = validated_data['user']
-        return self.Meta.model.objects.create(user=user, recipe=recipe)
+        if not insert_link(self.Meta.model, user, 'recipe', recipe):
+            if not Recipe.objects.filter(pk=recipe).exists():
+                raise NotFound('Рецепт не найден.')
+            raise serializers.ValidationError(
+                'Рецепт уже добавлен в этот список.'
+            )
+        change_counter(Recipe, recipe, self.Meta.counter_field, 1)
+        self.items_changed(user)
+        return validated_data
 
+    @transaction.atomic
     def delete(self, data):
         user = data['user']
         recipe = data['recipe']
-        return get_object_or_404(self.Meta.model,
-                                 user=user,
-                                 recipe=recipe).delete()
+        deleted, _ = self.Meta.model.objects.filter(
+            user=user, recipe=recipe,
+        ).delete()
+        if not deleted:
+            raise NotFound('Рецепта нет в этом списке.')
+        change_counter(Recipe, recipe, self.Meta.counter_field, -1)
+        self.items_changed(user)
+        return deleted
+
+    def items_changed(self, user):
+        """Отмечает изменение списка пользователя для кешей."""
+        bump_version(user_version(user))
 
 
 class AddFavoriteRecipeSerializer(BaseItemOperationSerializer):
@@ -314,16 +606,159 @@ class AddFavoriteRecipeSerializer(BaseItemOperationSerializer):
 
     class Meta:
         model = Favorite
+        counter_field = 'favorites_count'
         item_model = Recipe
         item_serializer = ShortRecipesShowSerializer
         fields = ('user', 'recipe')
 
+    def items_changed(self, user):
+        super().items_changed(user)
+        # favorites_count выводится всем, а не только этому пользователю.
+        bump_version(FAVORITES_VERSION)
+
 
 class ShoppingCartSerializer(BaseItemOperationSerializer):
     """Сериализатор добавления и удаления рецептов из корзины покупок."""
 
     class Meta:
         model = ShoppingCart
+        counter_field = 'in_carts_count'
         item_model = Recipe
         item_serializer = ShortRecipesShowSerializer
         fields = ('user', 'recipe')
+
+    @transaction.atomic
+    def create(self, validated_data):
+        item = super().create(validated_data)
+        apply_shopping_cart_deltas(
+            (item['user'],), recipe_ingredient_amounts(item['recipe']),
+        )
+        return item
+
+    @transaction.atomic
+    def delete(self, data):
+        deleted = super().delete(data)
+        amounts = recipe_ingredient_amounts(data['recipe'])
+        apply_shopping_cart_deltas(
+            (data['user'],), negate_ingredient_amounts(amounts),
+        )
+        return deleted
+
+
+class BulkLinkSerializer(serializers.Serializer):
+    """
+    Пакетное добавление и удаление связей пользователя с объектами.
+
+    Изменения применяются одним INSERT и одним DELETE в транзакции.
+    Счётчики меняются только по строкам, которые эти запросы вернули,
+    поэтому параллельные запросы не сбивают их. Для каждого id
+    возвращается результат операции.
+    """
+
+    add = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        max_length=BULK_MAX_ITEMS,
+        default=list,
+    )
+    remove = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        max_length=BULK_MAX_ITEMS,
+        default=list,
+    )
+
+    def validate(self, data):
+        if set(data['add']) & set(data['remove']):
+            raise serializers.ValidationError(
+                'Нельзя одновременно добавить и удалить один объект.'
+            )
+        return data
+
+    @transaction.atomic
+    def create(self, validated_data):
+        meta = self.Meta
+        user = self.context['request'].user.pk
+        add = list(dict.fromkeys(validated_data['add']))
+        remove = list(dict.fromkeys(validated_data['remove']))
+        added = set(insert_links(meta.model, user, meta.field, add))
+        removed = set(delete_links(meta.model, user, meta.field, remove))
+        if added or removed:
+            self.links_changed(user, sorted(added), sorted(removed))
+        unchanged = set(add + remove) - added - removed
+        found = set(
+            meta.target_model.objects.filter(pk__in=unchanged)
+            .values_list('pk', flat=True)
+        ) if unchanged else set()
+        return {
+            'add': [
+                {'id': pk, 'status': (
+                    'added' if pk in added
+                    else 'exists' if pk in found else 'not_found'
+                )}
+                for pk in add
+            ],
+            'remove': [
+                {'id': pk, 'status': (
+                    'removed' if pk in removed
+                    else 'absent' if pk in found else 'not_found'
+                )}
+                for pk in remove
+            ],
+        }
+
+    def links_changed(self, user, added, removed):
+        """Обновляет счётчики объектов после изменения связей."""
+        meta = self.Meta
+        objects = meta.target_model.objects
+        change_counters(objects.filter(pk__in=added), meta.counter_field, 1)
+        change_counters(
+            objects.filter(pk__in=removed), meta.counter_field, -1,
+        )
+        bump_version(user_version(user))
+
+
+class BulkFavoriteSerializer(BulkLinkSerializer):
+    """Пакетное изменение избранного."""
+
+    class Meta:
+        model = Favorite
+        field = 'recipe'
+        target_model = Recipe
+        counter_field = 'favorites_count'
+
+    def links_changed(self, user, added, removed):
+        super().links_changed(user, added, removed)
+        bump_version(FAVORITES_VERSION)
+
+
+class BulkShoppingCartSerializer(BulkLinkSerializer):
+    """Пакетное изменение корзины покупок."""
+
+    class Meta:
+        model = ShoppingCart
+        field = 'recipe'
+        target_model = Recipe
+        counter_field = 'in_carts_count'
+
+    def links_changed(self, user, added, removed):
+        super().links_changed(user, added, removed)
+        apply_shopping_cart_deltas(
+            (user,), recipes_ingredient_deltas(added, removed),
+        )
+
+
+class BulkSubscriptionSerializer(BulkLinkSerializer):
+    """Пакетное изменение подписок."""
+
+    class Meta:
+        model = Follow
+        field = 'author'
+        target_model = User
+        counter_field = 'followers_count'
+
+    def validate(self, data):
+        data = super().validate(data)
+        if self.context['request'].user.pk in data['add']:
+            raise serializers.ValidationError(
+                'Нельзя подписаться на самого себя.'
+            )
+        return data
@@ -0,0 +1,162 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.contrib.auth import get_user_model
+from django.db.models.signals import (
+    m2m_changed, post_delete, post_save, pre_delete
+)
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from api.cache import (
+    FAVORITES_VERSION, INGREDIENTS_VERSION, RECIPE_INGREDIENTS_VERSION,
+    RECIPES_VERSION, TAGS_VERSION, author_version, bump_version,
+    token_version
+)
+from api.cards import invalidate_recipe_cards
+from api.search import update_search_documents
+from api.utils import (
+    apply_shopping_cart_deltas, change_counter, change_counters,
+    negate_ingredient_amounts, recipe_ingredient_amounts
+)
+from recipes.models import (
+    Favorite, Ingredient, Recipe, RecipeIngredient, ShoppingCart,
+    ShoppingCartTotal, Tag
+)
+from users.models import Follow
+
+User = get_user_model()
+
+recipe_ingredients_batch = ContextVar(
+    'recipe_ingredients_batch', default=False,
+)
+
+
+@contextmanager
+def batch_recipe_ingredients():
+    """
+    Ингредиенты рецепта внутри блока меняются пакетом: кеши, карточку
+    и поисковый документ вызывающий код обновляет один раз на рецепт.
+    """
+    token = recipe_ingredients_batch.set(True)
+    try:
+        yield
+    finally:
+        recipe_ingredients_batch.reset(token)
+
+
+@receiver(post_save, sender=Recipe)
+def recipe_saved(sender, instance, created, **kwargs):
+    if created:
+        change_counter(User, instance.author_id, 'recipes_count', 1)
+        bump_version(author_version(instance.author_id))
+        bump_version(RECIPE_INGREDIENTS_VERSION)
+    else:
+        update_search_documents(pk=instance.pk)
+    invalidate_recipe_cards(recipe=instance)
+
+
+@receiver(pre_delete, sender=Recipe)
+def recipe_deleted(sender, instance, **kwargs):
+    apply_shopping_cart_deltas(
+        ShoppingCart.objects.filter(recipe=instance)
+        .values_list('user_id', flat=True),
+        negate_ingredient_amounts(recipe_ingredient_amounts(instance.pk)),
+    )
+
+
+@receiver(post_delete, sender=Recipe)
+def recipe_removed(sender, instance, **kwargs):
+    change_counter(User, instance.author_id, 'recipes_count', -1)
+    bump_version(author_version(instance.author_id))
+    bump_version(RECIPES_VERSION)
+    bump_version(RECIPE_INGREDIENTS_VERSION)
+
+
+@receiver(post_save, sender=RecipeIngredient)
+@receiver(post_delete, sender=RecipeIngredient)
+def recipe_ingredient_changed(sender, instance, origin=None, **kwargs):
+    # При удалении рецепта строки удаляются каскадом, кеши сбрасывает
+    # recipe_removed.
+    if (
+        recipe_ingredients_batch.get()
+        or isinstance(origin, Recipe)
+        or getattr(origin, 'model', None) is Recipe
+    ):
+        return
+    bump_version(RECIPE_INGREDIENTS_VERSION)
+    update_search_documents(pk=instance.recipe_id)
+    invalidate_recipe_cards(recipe_id=instance.recipe_id)
+
+
+@receiver(m2m_changed, sender=Recipe.tags.through)
+def recipe_tags_changed(sender, instance, action, pk_set, reverse, **kwargs):
+    if not action.startswith('post_'):
+        return
+    if not reverse:
+        invalidate_recipe_cards(recipe=instance)
+    elif pk_set:
+        invalidate_recipe_cards(recipe_id__in=pk_set)
+    else:
+        invalidate_recipe_cards(recipe__tags=instance)
+
+
+@receiver(post_save, sender=Tag)
+@receiver(pre_delete, sender=Tag)
+def tag_changed(sender, instance, **kwargs):
+    bump_version(TAGS_VERSION)
+    invalidate_recipe_cards(recipe__tags=instance)
+
+
+@receiver(post_save, sender=Ingredient)
+def ingredient_changed(sender, instance, **kwargs):
+    bump_version(INGREDIENTS_VERSION)
+    update_search_documents(recipe_ingredients__ingredient=instance)
+    invalidate_recipe_cards(recipe__recipe_ingredients__ingredient=instance)
+    ShoppingCartTotal.objects.filter(ingredient=instance).update(
+        name=instance.name, measurement_unit=instance.measurement_unit,
+    )
+
+
+@receiver(post_delete, sender=Ingredient)
+def ingredient_deleted(sender, instance, **kwargs):
+    bump_version(INGREDIENTS_VERSION)
+
+
+@receiver(post_save, sender=User)
+def author_changed(sender, instance, created, update_fields, **kwargs):
+    if created or update_fields == frozenset(('last_login',)):
+        return
+    # Смена пароля или деактивация: закешированные токены устарели.
+    for key in Token.objects.filter(user=instance).values_list(
+        'key', flat=True,
+    ):
+        bump_version(token_version(key))
+    invalidate_recipe_cards(recipe__author=instance)
+
+
+@receiver(pre_delete, sender=User)
+def user_deleted(sender, instance, **kwargs):
+    # Связи пользователя удаляются каскадом, минуя сериализаторы.
+    for model, counter in (
+        (Favorite, 'favorites_count'), (ShoppingCart, 'in_carts_count'),
+    ):
+        changed = change_counters(
+            Recipe.objects.filter(
+                pk__in=model.objects.filter(user=instance).values('recipe'),
+            ),
+            counter, -1,
+        )
+        if changed and model is Favorite:
+            bump_version(FAVORITES_VERSION)
+    change_counters(
+        User.objects.filter(
+            pk__in=Follow.objects.filter(user=instance).values('author'),
+        ),
+        'followers_count', -1,
+    )
+
+
+@receiver(post_delete, sender=Token)
+def token_deleted(sender, instance, **kwargs):
+    bump_version(token_version(instance.key))
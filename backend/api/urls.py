@@ -1,6 +1,9 @@
+from django.conf import settings
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
+from api.async_views import (IngredientDetailView, IngredientListView,
+                             RecipeDetailView, TagDetailView, TagListView)
 from api.views import (IngredientViewSet, RecipeViewSet,
                        TagViewSet, UserViewSet)
 
@@ -11,7 +14,24 @@ router.register('tags', TagViewSet, basename='tags')
 router.register('recipes', RecipeViewSet, basename='recipes')
 router.register('users', UserViewSet, basename='users')
 
+# В режиме ASGI чтение тегов, ингредиентов и рецепта обслуживают
+# асинхронные представления, остальное остаётся за роутером.
+async_urlpatterns = [
+    path('tags/', TagListView.as_view()),
+    path('tags/<int:pk>/', TagDetailView.as_view()),
+    path('ingredients/', IngredientListView.as_view()),
+    path('ingredients/<int:pk>/', IngredientDetailView.as_view()),
+    path('recipes/<int:pk>/', RecipeDetailView.as_view(
+        sync_view=RecipeViewSet.as_view(
+            {'get': 'retrieve', 'patch': 'partial_update',
+             'delete': 'destroy'},
+            basename='recipes', detail=True,
+        ),
+    )),
+]
+
 urlpatterns = [
     path('auth/', include('djoser.urls.authtoken')),
+    *(async_urlpatterns if settings.SERVER_MODE == 'asgi' else ()),
     path('', include(router.urls)),
 ]
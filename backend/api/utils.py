@@ -1,25 +1,336 @@
-from django.db.models import Sum
+import csv
+from functools import lru_cache
+from io import BytesIO
 
-from recipes.models import RecipeIngredient
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connections, router, transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.http import HttpResponse, StreamingHttpResponse
+from django.utils import timezone
+from reportlab.lib.pagesizes import A4
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.pdfgen import canvas
+
+from api.constants import (
+    SHOPPING_CART_CHUNK_SIZE, SHOPPING_CART_PDF_FONT_NAME,
+    SHOPPING_CART_PDF_FONT_SIZE, SHOPPING_CART_PDF_MARGIN,
+    SHOPPING_CART_TITLE
+)
+from recipes.models import RecipeIngredient, ShoppingCart, ShoppingCartTotal
+
+User = get_user_model()
+
+
+def change_counters(queryset, field, delta):
+    """Изменяет счётчик строк набора атомарным UPDATE с F()."""
+    return queryset.update(**{field: Greatest(F(field) + delta, 0)})
+
+
+def change_counter(model, pk, field, delta):
+    """Изменяет счётчик одной строки атомарным UPDATE с F()."""
+    change_counters(model.objects.filter(pk=pk), field, delta)
+
+
+def _insert_links_sql(model, field, connection):
+    """
+    Начало запроса INSERT ... SELECT связи пользователя с объектами
+    и его параметры без id пользователя и объектов.
+    """
+    quote = connection.ops.quote_name
+    meta = model._meta
+    target = meta.get_field(field)
+    target_meta = target.related_model._meta
+    columns = [meta.get_field('user').column, target.column]
+    values = ['%s', quote(target_meta.pk.column)]
+    params = []
+    for extra in meta.concrete_fields:
+        if getattr(extra, 'auto_now_add', False):
+            columns.append(extra.column)
+            values.append('%s')
+            params.append(
+                extra.get_db_prep_save(timezone.now(), connection)
+            )
+    sql = (
+        f'INSERT INTO {quote(meta.db_table)} '
+        f'({", ".join(quote(column) for column in columns)}) '
+        f'SELECT {", ".join(values)} FROM {quote(target_meta.db_table)} '
+        f'WHERE {quote(target_meta.pk.column)}'
+    )
+    return sql, params
+
+
+def insert_link(model, user_id, field, target_id):
+    """
+    Связывает пользователя с объектом одним запросом
+    INSERT ... SELECT ... ON CONFLICT DO NOTHING.
+
+    Возвращает True, если строка добавлена. False означает, что
+    связь уже есть или объекта target_id не существует.
+    """
+    connection = connections[router.db_for_write(model)]
+    sql, params = _insert_links_sql(model, field, connection)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'{sql} = %s ON CONFLICT DO NOTHING',
+            [user_id, *params, target_id],
+        )
+        return cursor.rowcount == 1
+
+
+def insert_links(model, user_id, field, target_ids):
+    """
+    Связывает пользователя с объектами одним запросом
+    INSERT ... SELECT ... ON CONFLICT DO NOTHING RETURNING.
+
+    Возвращает id объектов, для которых строка действительно
+    добавлена: без уже существующих связей, в том числе добавленных
+    параллельным запросом, и без несуществующих объектов.
+    """
+    if not target_ids:
+        return []
+    connection = connections[router.db_for_write(model)]
+    quote = connection.ops.quote_name
+    sql, params = _insert_links_sql(model, field, connection)
+    placeholders = ', '.join(['%s'] * len(target_ids))
+    column = model._meta.get_field(field).column
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'{sql} IN ({placeholders}) ON CONFLICT DO NOTHING '
+            f'RETURNING {quote(column)}',
+            [user_id, *params, *target_ids],
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+def delete_links(model, user_id, field, target_ids):
+    """
+    Удаляет связи пользователя с объектами одним запросом
+    DELETE ... RETURNING. Возвращает id объектов, связи с которыми
+    действительно удалены этим запросом.
+    """
+    if not target_ids:
+        return []
+    connection = connections[router.db_for_write(model)]
+    quote = connection.ops.quote_name
+    meta = model._meta
+    column = quote(meta.get_field(field).column)
+    placeholders = ', '.join(['%s'] * len(target_ids))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {quote(meta.db_table)} '
+            f'WHERE {quote(meta.get_field("user").column)} = %s '
+            f'AND {column} IN ({placeholders}) RETURNING {column}',
+            [user_id, *target_ids],
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+def shopping_cart_totals(user):
+    """Готовые суммы ингредиентов корзины пользователя."""
+
+    return ShoppingCartTotal.objects.filter(user=user).values_list(
+        'name', 'measurement_unit', 'amount',
+    ).order_by('name').iterator(chunk_size=SHOPPING_CART_CHUNK_SIZE)
+
+
+def recipe_ingredient_amounts(recipe_id):
+    """Количества ингредиентов рецепта: {id: (название, единица, сумма)}."""
+
+    amounts = {}
+    rows = RecipeIngredient.objects.filter(recipe_id=recipe_id).values_list(
+        'ingredient_id', 'ingredient__name',
+        'ingredient__measurement_unit', 'amount',
+    )
+    for ingredient_id, name, measurement_unit, amount in rows:
+        total = amounts.get(ingredient_id, (name, measurement_unit, 0))[2]
+        amounts[ingredient_id] = (name, measurement_unit, total + amount)
+    return amounts
+
+
+def recipes_ingredient_deltas(added, removed):
+    """
+    Изменения количеств ингредиентов корзины при добавлении рецептов
+    added и удалении рецептов removed, одним запросом.
+    """
+    added = set(added)
+    deltas = {}
+    rows = RecipeIngredient.objects.filter(
+        recipe_id__in=added.union(removed),
+    ).values_list(
+        'recipe_id', 'ingredient_id', 'ingredient__name',
+        'ingredient__measurement_unit', 'amount',
+    )
+    for recipe_id, ingredient_id, name, measurement_unit, amount in rows:
+        total = deltas.get(ingredient_id, (name, measurement_unit, 0))[2]
+        amount = amount if recipe_id in added else -amount
+        deltas[ingredient_id] = (name, measurement_unit, total + amount)
+    return {
+        ingredient_id: delta
+        for ingredient_id, delta in deltas.items() if delta[2]
+    }
+
+
+def diff_ingredient_amounts(old, new):
+    """Изменения количеств ингредиентов между двумя состояниями рецепта."""
+
+    deltas = {}
+    for ingredient_id in old.keys() | new.keys():
+        name, measurement_unit, _ = new.get(ingredient_id) or old[
+            ingredient_id
+        ]
+        new_amount = new[ingredient_id][2] if ingredient_id in new else 0
+        old_amount = old[ingredient_id][2] if ingredient_id in old else 0
+        if new_amount != old_amount:
+            deltas[ingredient_id] = (
+                name, measurement_unit, new_amount - old_amount,
+            )
+    return deltas
+
+
+def negate_ingredient_amounts(amounts):
+    return {
+        ingredient_id: (name, measurement_unit, -amount)
+        for ingredient_id, (name, measurement_unit, amount) in amounts.items()
+    }
+
+
+@transaction.atomic
+def apply_shopping_cart_deltas(user_ids, deltas):
+    """
+    Применяет изменения количеств ингредиентов к итогам корзин
+    пользователей. Строки пользователей блокируются, чтобы
+    параллельные изменения одной корзины не теряли обновлений.
+    """
+    user_ids = sorted(set(user_ids))
+    if not user_ids or not deltas:
+        return
+    list(
+        User.objects.select_for_update().filter(pk__in=user_ids)
+        .order_by('pk').values_list('pk', flat=True)
+    )
+
+    existing = {
+        (total.user_id, total.ingredient_id): total
+        for total in ShoppingCartTotal.objects.filter(
+            user_id__in=user_ids, ingredient_id__in=deltas.keys(),
+        )
+    }
+    to_create, to_update, to_delete = [], [], []
+    for user_id in user_ids:
+        for ingredient_id, (name, unit, delta) in deltas.items():
+            total = existing.get((user_id, ingredient_id))
+            if total is None:
+                if delta > 0:
+                    to_create.append(ShoppingCartTotal(
+                        user_id=user_id, ingredient_id=ingredient_id,
+                        name=name, measurement_unit=unit, amount=delta,
+                    ))
+            elif total.amount + delta > 0:
+                total.amount += delta
+                to_update.append(total)
+            else:
+                to_delete.append(total.pk)
+
+    ShoppingCartTotal.objects.bulk_create(to_create)
+    ShoppingCartTotal.objects.bulk_update(to_update, ('amount',))
+    ShoppingCartTotal.objects.filter(pk__in=to_delete).delete()
+
+
+def update_shopping_carts_for_recipe(recipe_id, old_amounts):
+    """Переносит изменение ингредиентов рецепта в корзины с этим рецептом."""
+
+    deltas = diff_ingredient_amounts(
+        old_amounts, recipe_ingredient_amounts(recipe_id),
+    )
+    if deltas:
+        apply_shopping_cart_deltas(
+            ShoppingCart.objects.filter(recipe_id=recipe_id)
+            .values_list('user_id', flat=True),
+            deltas,
+        )
 
 
 def shopping_cart_report(user):
-    """Обработчик корзины покупок."""
-
-    ingredient_totals = RecipeIngredient.objects.filter(
-        recipe__shopping_list__user=user,
-    ).values(
-        'ingredient__name', 'ingredient__measurement_unit',
-    ).annotate(
-        total_amount=Sum('amount')
-    ).order_by('ingredient__name')
-
-    buy_list_text = 'Foodgram\nКорзина покупок:\n'
-    for ingredient_total in ingredient_totals:
-        ingredient_name = ingredient_total['ingredient__name']
-        measurement_unit = ingredient_total['ingredient__measurement_unit']
-        total_amount = ingredient_total['total_amount']
-        buy_list_text += (f'{ingredient_name}, '
-                          f'{total_amount} {measurement_unit}\n')
-
-    return buy_list_text
+    """Обработчик корзины покупок в виде текста."""
+
+    yield f'Foodgram\n{SHOPPING_CART_TITLE}:\n'
+    for name, measurement_unit, total_amount in shopping_cart_totals(user):
+        yield f'{name}, {total_amount} {measurement_unit}\n'
+
+
+class _Echo:
+    """Псевдобуфер: csv.writer сразу возвращает записанную строку."""
+
+    def write(self, value):
+        return value
+
+
+def shopping_cart_csv(user):
+    """Обработчик корзины покупок в виде CSV."""
+
+    writer = csv.writer(_Echo())
+    yield writer.writerow(('Ингредиент', 'Количество', 'Единица измерения'))
+    for name, measurement_unit, total_amount in shopping_cart_totals(user):
+        yield writer.writerow((name, total_amount, measurement_unit))
+
+
+@lru_cache(maxsize=None)
+def shopping_cart_pdf_font():
+    """
+    Регистрирует шрифт PDF при первом обращении. Отсутствующий
+    или повреждённый файл шрифта вызывает TTFError, и ошибка
+    не кешируется.
+    """
+    pdfmetrics.registerFont(TTFont(
+        SHOPPING_CART_PDF_FONT_NAME, settings.SHOPPING_CART_PDF_FONT,
+    ))
+    return SHOPPING_CART_PDF_FONT_NAME
+
+
+def shopping_cart_pdf(user):
+    """
+    Обработчик корзины покупок в виде PDF.
+
+    reportlab записывает документ целиком при сохранении, поэтому
+    он собирается в памяти и отдаётся обычным ответом. Строки
+    берутся из БД порциями.
+    """
+    font = shopping_cart_pdf_font()
+    buffer = BytesIO()
+    pdf = canvas.Canvas(buffer, pagesize=A4)
+    _, height = A4
+    line_height = SHOPPING_CART_PDF_FONT_SIZE * 1.5
+
+    def new_page():
+        pdf.setFont(font, SHOPPING_CART_PDF_FONT_SIZE)
+        return height - SHOPPING_CART_PDF_MARGIN
+
+    y = new_page()
+    pdf.drawString(SHOPPING_CART_PDF_MARGIN, y, SHOPPING_CART_TITLE)
+    y -= line_height * 2
+    for name, measurement_unit, total_amount in shopping_cart_totals(user):
+        if y < SHOPPING_CART_PDF_MARGIN:
+            pdf.showPage()
+            y = new_page()
+        pdf.drawString(
+            SHOPPING_CART_PDF_MARGIN, y,
+            f'{name}, {total_amount} {measurement_unit}',
+        )
+        y -= line_height
+    pdf.save()
+    return buffer.getvalue()
+
+
+SHOPPING_CART_FORMATS = {
+    'txt': (
+        shopping_cart_report, 'text/plain; charset=utf-8',
+        StreamingHttpResponse,
+    ),
+    'csv': (
+        shopping_cart_csv, 'text/csv; charset=utf-8', StreamingHttpResponse,
+    ),
+    'pdf': (shopping_cart_pdf, 'application/pdf', HttpResponse),
+}
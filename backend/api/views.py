@@ -1,36 +1,57 @@
+import logging
+from hashlib import md5
+
+from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.http import HttpResponse
-from django.shortcuts import get_object_or_404
-from django.db.models import Exists, OuterRef
+from django.db.models import Value
+from django.http import Http404
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters, status, viewsets
 from rest_framework.decorators import action
 from rest_framework.permissions import (
     AllowAny, IsAuthenticated, IsAuthenticatedOrReadOnly
 )
+from reportlab.pdfbase.ttfonts import TTFError
 from rest_framework.response import Response
 
+from api.autocomplete import ingredient_autocomplete
+from api.cache import (
+    FAVORITES_VERSION, INGREDIENTS_VERSION, RECIPES_VERSION, TAGS_VERSION,
+    author_version, get_last_modified, get_versions
+)
+from api.constants import (
+    AUTOCOMPLETE_LIMIT, AUTOCOMPLETE_MAX_LIMIT, FEED_TIMELINE_KEY,
+    SHOPPING_CART_FILENAME, SHOPPING_CART_FORMAT_PARAM
+)
 from api.filters import IngredientFilter, RecipeFilter
-from api.mixins import CreateListRetrieveViewSet
-from api.paginators import PageNumberLimitPaginator
+from api.matching import recipe_matcher
+from api.mixins import (
+    AnonymousResponseCacheMixin, ConditionalGetMixin,
+    CreateListRetrieveViewSet, KeysetPaginationMixin
+)
+from api.paginators import PageNumberLimitPaginator, TimelineKeysetPaginator
+from api.registry import tag_registry
+from api.routers import pin_primary_after_change
 from api.serializers import (
     SubscriptionSerializer, AddFavoriteRecipeSerializer,
-    GetRecipeSerializer, IngredientSerializer,
+    BulkFavoriteSerializer, BulkShoppingCartSerializer,
+    BulkSubscriptionSerializer,
+    IngredientSerializer, RecipeCardSerializer, RecipeMatchSerializer,
     RecipeCreateAndUpdateSerializer, SetNewPasswordSerializer,
     ShoppingCartSerializer, SubscriptionShowSerializer, TagSerializer,
-    AddUserSerializer, UserReadSerializer
+    AddUserSerializer, UserProfileSerializer
 )
-from api.utils import shopping_cart_report
+from api.utils import SHOPPING_CART_FORMATS
 
-from recipes.models import (
-    Favorite, Ingredient, Recipe, ShoppingCart, Tag
-)
+from recipes.models import Ingredient, Recipe
 from users.models import Follow
 
 User = get_user_model()
 
+logger = logging.getLogger(__name__)
 
-class UserViewSet(CreateListRetrieveViewSet):
+
+class UserViewSet(KeysetPaginationMixin, CreateListRetrieveViewSet):
     queryset = User.objects.all()
     filter_backends = (DjangoFilterBackend, filters.SearchFilter)
     search_fields = ('username',)
@@ -39,11 +60,13 @@ class UserViewSet(CreateListRetrieveViewSet):
 
     def get_serializer_class(self):
         if self.action in ('list', 'retrieve'):
-            return UserReadSerializer
+            return UserProfileSerializer
         if self.action == 'set_password':
             return SetNewPasswordSerializer
         if self.action == 'subscribe':
             return SubscriptionSerializer
+        if self.action == 'bulk_subscribe':
+            return BulkSubscriptionSerializer
         return AddUserSerializer
 
     @action(
@@ -85,7 +108,9 @@ class UserViewSet(CreateListRetrieveViewSet):
         pagination_class=PageNumberLimitPaginator
     )
     def subscriptions(self, request):
-        subscriptions = User.objects.filter(following__user=request.user)
+        subscriptions = User.objects.filter(
+            following__user=request.user,
+        ).annotate(is_subscribed=Value(True)).order_by('username')
 
         paginated_queryset = self.paginate_queryset(subscriptions)
         serializer = self.serializer_class(paginated_queryset,
@@ -99,19 +124,11 @@ class UserViewSet(CreateListRetrieveViewSet):
             permission_classes=(IsAuthenticated,),
             )
     def subscribe(self, request, pk=None):
-        context = {'request': request}
-        user = request.user.pk
-        author = get_object_or_404(User, pk=pk).pk
-        data = {
-            'user': user,
-            'author': author,
-        }
+        serializer = self.get_serializer(
+            data={'user': request.user.pk, 'author': pk},
+        )
+        serializer.is_valid(raise_exception=True)
         if request.method == 'POST':
-            serializer = self.get_serializer(
-                data=data,
-                context=context
-            )
-            serializer.is_valid(raise_exception=True)
             response_data = serializer.save()
             return Response(
                 {'message': 'Подписка успешно создана.',
@@ -119,18 +136,29 @@ class UserViewSet(CreateListRetrieveViewSet):
                 status=status.HTTP_201_CREATED,
             )
 
-        subscription = get_object_or_404(
-            Follow, user=user,
-            author=author
-        )
-        subscription.delete()
+        serializer.delete(serializer.validated_data)
         return Response(
             {'message': 'Подписка успешно удалена.'},
             status=status.HTTP_204_NO_CONTENT,
         )
 
+    @action(
+        detail=False,
+        methods=('post',),
+        permission_classes=(IsAuthenticated,),
+    )
+    def bulk_subscribe(self, request):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        return Response(serializer.save(), status=status.HTTP_200_OK)
+
 
-class RecipeViewSet(viewsets.ModelViewSet):
+class RecipeViewSet(
+    ConditionalGetMixin,
+    AnonymousResponseCacheMixin,
+    KeysetPaginationMixin,
+    viewsets.ModelViewSet,
+):
     permission_classes = (IsAuthenticatedOrReadOnly,)
     http_method_names = [
         'get',
@@ -141,37 +169,53 @@ class RecipeViewSet(viewsets.ModelViewSet):
     filter_backends = (DjangoFilterBackend,)
     filterset_class = RecipeFilter
     pagination_class = PageNumberLimitPaginator
+    version_names = (RECIPES_VERSION, FAVORITES_VERSION)
+    user_dependent = True
+    cache_version_names = version_names
+    cache_query_params = (
+        'tags', 'author', 'search', 'ordering', 'page', 'limit', 'cursor',
+    )
 
     def get_serializer_class(self):
-        if self.action in ('list', 'retrieve'):
-            return GetRecipeSerializer
+        if self.action in ('list', 'retrieve', 'feed', 'match'):
+            return RecipeCardSerializer
         if self.action == 'shopping_cart':
             return ShoppingCartSerializer
         if self.action == 'favorite':
             return AddFavoriteRecipeSerializer
+        if self.action == 'bulk_favorite':
+            return BulkFavoriteSerializer
+        if self.action == 'bulk_shopping_cart':
+            return BulkShoppingCartSerializer
         return RecipeCreateAndUpdateSerializer
 
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        if self.action in ('list', 'feed', 'match'):
+            context['card_image'] = 'image_thumbnail'
+        return context
+
     def get_queryset(self):
-        queryset = Recipe.objects.select_related('author').prefetch_related(
-            'tags',
-            'ingredients',
-            'shopping_list',
-            'favorites',
+        if self.action in ('list', 'retrieve', 'feed', 'match'):
+            return Recipe.objects.with_card(self.request.user)
+        return Recipe.objects.with_user_flags(self.request.user)
+
+    def _toggle_item(self, request, pk):
+        serializer = self.get_serializer(
+            data={'user': request.user.pk, 'recipe': pk},
         )
+        serializer.is_valid(raise_exception=True)
+        if request.method == 'POST':
+            serializer.save()
+            return Response(serializer.data, status=status.HTTP_201_CREATED)
 
-        if self.request.user.is_authenticated:
-            return queryset.annotate(
-                is_favorited=Exists(
-                    Favorite.objects.filter(
-                        user=self.request.user, recipe=OuterRef('id')
-                    )
-                ),
-                is_in_shopping_cart=Exists(
-                    ShoppingCart.objects.filter(
-                        user=self.request.user, recipe=OuterRef('id')
-                    )
-                )
-            )
+        return Response(serializer.delete(serializer.validated_data),
+                        status=status.HTTP_204_NO_CONTENT)
+
+    def _bulk_items(self, request):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        return Response(serializer.save(), status=status.HTTP_200_OK)
 
     @action(
         methods=('post', 'delete',),
@@ -179,21 +223,7 @@ class RecipeViewSet(viewsets.ModelViewSet):
         permission_classes=(IsAuthenticated,),
     )
     def favorite(self, request, pk=None):
-        context = {'request': request}
-        recipe = get_object_or_404(Recipe, pk=pk).pk
-        user = request.user.pk
-        data = {
-            'user': user,
-            'recipe': recipe,
-        }
-        serializer = self.get_serializer(data=data, context=context)
-        if request.method == 'POST':
-            serializer.is_valid(raise_exception=True)
-            serializer.save()
-            return Response(serializer.data, status=status.HTTP_201_CREATED)
-
-        return Response(serializer.delete(data),
-                        status=status.HTTP_204_NO_CONTENT)
+        return self._toggle_item(request, pk)
 
     @action(
         methods=('post', 'delete',),
@@ -201,21 +231,85 @@ class RecipeViewSet(viewsets.ModelViewSet):
         permission_classes=(IsAuthenticated,),
     )
     def shopping_cart(self, request, pk=None):
-        context = {'request': request}
-        recipe = get_object_or_404(Recipe, pk=pk).pk
-        user = request.user.pk
-        data = {
-            'user': user,
-            'recipe': recipe,
-        }
-        serializer = self.get_serializer(data=data, context=context)
-        if request.method == 'POST':
-            serializer.is_valid(raise_exception=True)
-            serializer.save()
-            return Response(serializer.data, status=status.HTTP_201_CREATED)
+        return self._toggle_item(request, pk)
 
-        return Response(serializer.delete(data),
-                        status=status.HTTP_204_NO_CONTENT)
+    @action(
+        methods=('post',),
+        detail=False,
+        permission_classes=(IsAuthenticated,),
+    )
+    def bulk_favorite(self, request):
+        return self._bulk_items(request)
+
+    @action(
+        methods=('post',),
+        detail=False,
+        permission_classes=(IsAuthenticated,),
+    )
+    def bulk_shopping_cart(self, request):
+        return self._bulk_items(request)
+
+    @action(
+        detail=False,
+        methods=('get',),
+        permission_classes=(IsAuthenticated,),
+    )
+    def feed(self, request):
+        user = request.user
+        queryset = self.get_queryset().filter(
+            author__in=Follow.objects.filter(user=user).values('author'),
+        ).order_by('-pub_date')
+        paginator = TimelineKeysetPaginator()
+        if settings.FEED_TIMELINE_CACHE:
+            paginator.timeline_key = self.get_timeline_key(user)
+        page = paginator.paginate_queryset(queryset, request, view=self)
+        serializer = self.get_serializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
+
+    @staticmethod
+    def get_timeline_key(user):
+        """
+        Ключ ленты по подпискам и версиям наборов рецептов авторов:
+        лента устаревает только при подписке, отписке и появлении
+        или удалении рецептов этих авторов.
+        """
+        names = sorted(
+            author_version(author_id) for author_id in
+            Follow.objects.filter(user=user).values_list(
+                'author_id', flat=True,
+            )
+        )
+        versions = get_versions(names)
+        pin_primary_after_change(get_last_modified(names))
+        fingerprint = '|'.join(f'{name}={versions[name]}' for name in names)
+        return FEED_TIMELINE_KEY.format(
+            user.pk, md5(fingerprint.encode()).hexdigest(),
+        )
+
+    @action(detail=False, methods=('get',))
+    def match(self, request):
+        params = RecipeMatchSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        matches = recipe_matcher.match(
+            params.validated_data['ingredients'],
+            params.validated_data.get('max_missing'),
+        )
+        paginator = PageNumberLimitPaginator()
+        page = paginator.paginate_queryset(matches, request, view=self)
+        recipes = self.get_queryset().in_bulk(
+            [recipe_id for recipe_id, _, _ in page],
+        )
+        counts = {
+            recipe_id: (matched, total) for recipe_id, matched, total in page
+        }
+        data = self.get_serializer(
+            [recipes[pk] for pk in counts if pk in recipes], many=True,
+        ).data
+        for item in data:
+            matched, total = counts[item['id']]
+            item['matched_ingredients'] = matched
+            item['missing_ingredients'] = total - matched
+        return paginator.get_paginated_response(data)
 
     @action(
         detail=False,
@@ -223,25 +317,73 @@ class RecipeViewSet(viewsets.ModelViewSet):
         permission_classes=(IsAuthenticated,),
     )
     def download_shopping_cart(self, request):
-        buy_list_text = shopping_cart_report(request.user)
-        response = HttpResponse(buy_list_text, content_type="text/plain")
+        file_format = request.query_params.get(
+            SHOPPING_CART_FORMAT_PARAM, 'txt'
+        )
+        if file_format not in SHOPPING_CART_FORMATS:
+            return Response(
+                {'error': 'Неподдерживаемый формат файла.'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        report, content_type, response_class = (
+            SHOPPING_CART_FORMATS[file_format]
+        )
+        try:
+            content = report(request.user)
+        except TTFError:
+            # Ошибка шрифта выясняется до ответа, а не посреди файла.
+            logger.exception('Не удалось загрузить шрифт корзины покупок')
+            return Response(
+                {'error': 'Выгрузка в этом формате недоступна.'},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
+            )
+        response = response_class(content, content_type=content_type)
+        if not response.streaming:
+            response['Content-Length'] = len(response.content)
         response['Content-Disposition'] = (
-            'attachment; filename=shopping-list.txt'
+            f'attachment; filename={SHOPPING_CART_FILENAME}.{file_format}'
         )
         return response
 
 
-class IngredientViewSet(viewsets.ReadOnlyModelViewSet):
+class IngredientViewSet(ConditionalGetMixin, viewsets.ReadOnlyModelViewSet):
     queryset = Ingredient.objects.all()
     serializer_class = IngredientSerializer
     permission_classes = (AllowAny,)
     filter_backends = (DjangoFilterBackend,)
     filterset_class = IngredientFilter
     pagination_class = None
+    version_names = (INGREDIENTS_VERSION,)
 
+    @action(detail=False, methods=('get',))
+    def autocomplete(self, request):
+        try:
+            limit = min(
+                int(request.query_params.get('limit', AUTOCOMPLETE_LIMIT)),
+                AUTOCOMPLETE_MAX_LIMIT,
+            )
+        except ValueError:
+            limit = AUTOCOMPLETE_LIMIT
+        return Response(ingredient_autocomplete.search(
+            request.query_params.get('name', ''), max(limit, 0),
+        ))
 
-class TagViewSet(viewsets.ReadOnlyModelViewSet):
-    queryset = Tag.objects.all()
+
+class TagViewSet(ConditionalGetMixin, viewsets.ReadOnlyModelViewSet):
     serializer_class = TagSerializer
     permission_classes = (AllowAny,)
+    filter_backends = ()
     pagination_class = None
+    version_names = (TAGS_VERSION,)
+
+    def get_queryset(self):
+        return tag_registry.all()
+
+    def get_object(self):
+        try:
+            tag = tag_registry.get(int(self.kwargs[self.lookup_field]))
+        except ValueError:
+            tag = None
+        if tag is None:
+            raise Http404
+        return tag
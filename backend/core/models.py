@@ -0,0 +1,24 @@
+class CounterFieldsMixin:
+    """
+    Модель со счётчиками, которые меняются атомарными UPDATE с F().
+
+    Полное сохранение загруженного объекта пропускает counter_fields,
+    иначе оно записало бы поверх параллельных изменений значения,
+    прочитанные вместе с объектом.
+    """
+
+    counter_fields = ()
+
+    def save(self, *args, **kwargs):
+        if (
+            not self._state.adding
+            and not args
+            and kwargs.get('update_fields') is None
+            and not kwargs.get('force_insert')
+        ):
+            skipped = {*self.counter_fields, *self.get_deferred_fields()}
+            kwargs['update_fields'] = [
+                field.attname for field in self._meta.concrete_fields
+                if not field.primary_key and field.attname not in skipped
+            ]
+        super().save(*args, **kwargs)
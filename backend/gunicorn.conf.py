@@ -0,0 +1,15 @@
+import os
+
+# SERVER_MODE=asgi запускает приложение ASGI в воркерах uvicorn:
+# один процесс обслуживает много медленных клиентов одновременно.
+SERVER_MODE = os.getenv('SERVER_MODE', 'wsgi').lower()
+
+bind = '0.0.0.0:8000'
+workers = int(os.getenv('GUNICORN_WORKERS', 3))
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 30))
+
+if SERVER_MODE == 'asgi':
+    wsgi_app = 'foodgram_backend.asgi:application'
+    worker_class = 'uvicorn.workers.UvicornWorker'
+else:
+    wsgi_app = 'foodgram_backend.wsgi:application'
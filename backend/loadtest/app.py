@@ -0,0 +1,33 @@
+"""
+Приложения WSGI и ASGI для нагрузочного сравнения режимов.
+
+LOADTEST_DB_LATENCY_MS добавляет задержку к каждому запросу к БД,
+как у базы данных в другой сети. Задержка блокирует поток так же,
+как ожидание ответа настоящей базы данных.
+"""
+import os
+import time
+
+from django.core.asgi import get_asgi_application
+from django.core.wsgi import get_wsgi_application
+from django.db.backends.signals import connection_created
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'foodgram_backend.settings')
+
+DB_LATENCY = int(os.getenv('LOADTEST_DB_LATENCY_MS', 0)) / 1000
+
+
+def network_latency(execute, sql, params, many, context):
+    time.sleep(DB_LATENCY)
+    return execute(sql, params, many, context)
+
+
+def add_latency(sender, connection, **kwargs):
+    if DB_LATENCY and network_latency not in connection.execute_wrappers:
+        connection.execute_wrappers.append(network_latency)
+
+
+connection_created.connect(add_latency)
+
+wsgi_application = get_wsgi_application()
+asgi_application = get_asgi_application()
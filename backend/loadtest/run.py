@@ -0,0 +1,103 @@
+"""
+Нагрузочное сравнение режимов WSGI и ASGI.
+
+Сервер запускается отдельно из каталога backend, например:
+
+    gunicorn -c gunicorn.conf.py loadtest.app:wsgi_application
+    SERVER_MODE=asgi gunicorn -c gunicorn.conf.py \\
+        loadtest.app:asgi_application
+
+LOADTEST_DB_LATENCY_MS=20 у сервера имитирует базу данных в сети.
+Затем для каждого режима:
+
+    python loadtest/run.py http://127.0.0.1:8000 --recipe 1
+    python loadtest/run.py http://127.0.0.1:8000 --recipe 1 \\
+        --slow-client 0.5
+
+--slow-client держит соединение открытым, отправляя запрос
+по частям, как медленный клиент. Пока воркер не принял соединение,
+начало запроса ждёт в буфере сокета ядра. Выводится число запросов в секунду,
+50-й и 95-й процентили времени ответа и число ошибок.
+"""
+import argparse
+import socket
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+ENDPOINTS = (
+    '/api/tags/',
+    # name=с в кодировке URL.
+    '/api/ingredients/?name=%D1%81',
+    '/api/recipes/{recipe}/',
+)
+
+
+def request(url, slow_client, timeout):
+    """Один запрос GET, время ответа или None при ошибке."""
+    parts = urlsplit(url)
+    path = parts.path + (f'?{parts.query}' if parts.query else '')
+    head = (
+        f'GET {path} HTTP/1.1\r\nHost: {parts.hostname}\r\n'
+        'Connection: close\r\n'
+    ).encode()
+    start = time.perf_counter()
+    try:
+        with socket.create_connection(
+            (parts.hostname, parts.port or 80), timeout=timeout,
+        ) as connection:
+            connection.sendall(head)
+            if slow_client:
+                time.sleep(slow_client)
+            connection.sendall(b'\r\n')
+            response = b''
+            while chunk := connection.recv(65536):
+                response += chunk
+    except OSError:
+        return None
+    if not response.startswith(b'HTTP/1.1 200'):
+        return None
+    return time.perf_counter() - start
+
+
+def run(url, requests, concurrency, slow_client, timeout):
+    start = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as executor:
+        results = list(executor.map(
+            lambda _: request(url, slow_client, timeout), range(requests),
+        ))
+    total = time.perf_counter() - start
+    latencies = sorted(result for result in results if result is not None)
+    errors = len(results) - len(latencies)
+    if not latencies:
+        return f'rps=0 ошибок={errors}'
+    return (
+        f'rps={len(latencies) / total:7.1f} '
+        f'p50={latencies[len(latencies) // 2] * 1000:7.1f} мс '
+        f'p95={latencies[int(len(latencies) * 0.95)] * 1000:7.1f} мс '
+        f'ошибок={errors}'
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('server', help='Адрес сервера, например '
+                                       'http://127.0.0.1:8000')
+    parser.add_argument('--recipe', type=int, default=1,
+                        help='id рецепта для запроса рецепта.')
+    parser.add_argument('--requests', type=int, default=500)
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--slow-client', type=float, default=0,
+                        help='Пауза в секундах посреди отправки запроса.')
+    parser.add_argument('--timeout', type=float, default=30)
+    options = parser.parse_args()
+    for endpoint in ENDPOINTS:
+        path = endpoint.format(recipe=options.recipe)
+        print(f'{path:28} ' + run(
+            options.server.rstrip('/') + path, options.requests,
+            options.concurrency, options.slow_client, options.timeout,
+        ))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,12 +1,33 @@
 from django import forms
 from django.contrib import admin
+from django.db import transaction
 
+from api.images import schedule_image_processing
+from api.utils import (
+    recipe_ingredient_amounts, update_shopping_carts_for_recipe
+)
 from recipes.models import (
     Favorite, Ingredient, RecipeIngredient,
     Recipe, ShoppingCart, Tag
 )
 
 
+class ReadOnlyAdmin(admin.ModelAdmin):
+    """
+    Просмотр связей без изменения: добавление и удаление идут через API,
+    которое поддерживает счётчики и итоги корзин.
+    """
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
 class RecipeIngredientInline(admin.TabularInline):
     model = RecipeIngredient
     extra = 1
@@ -33,12 +54,25 @@ class RecipeAdmin(admin.ModelAdmin):
     form = RecipeAdminForm
 
     inlines = [RecipeIngredientInline]
-    list_display = ('name', 'author', 'favorites_count')
+    list_display = ('name', 'author', 'favorites_count', 'in_carts_count')
     search_fields = ('name',)
     list_filter = ('name', 'author', 'tags')
 
-    def favorites_count(self, obj):
-        return obj.favorites.count()
+    def save_model(self, request, obj, form, change):
+        if 'image' in form.changed_data:
+            obj.image_width = obj.image.width
+            obj.image_height = obj.image.height
+        super().save_model(request, obj, form, change)
+        if 'image' in form.changed_data:
+            schedule_image_processing(obj.pk)
+
+    @transaction.atomic
+    def save_related(self, request, form, formsets, change):
+        old_amounts = (
+            recipe_ingredient_amounts(form.instance.pk) if change else {}
+        )
+        super().save_related(request, form, formsets, change)
+        update_shopping_carts_for_recipe(form.instance.pk, old_amounts)
 
 
 class IngredientAdmin(admin.ModelAdmin):
@@ -57,5 +91,5 @@ class TagAdmin(admin.ModelAdmin):
 admin.site.register(Recipe, RecipeAdmin)
 admin.site.register(Ingredient, IngredientAdmin)
 admin.site.register(Tag, TagAdmin)
-admin.site.register(Favorite)
-admin.site.register(ShoppingCart)
+admin.site.register(Favorite, ReadOnlyAdmin)
+admin.site.register(ShoppingCart, ReadOnlyAdmin)
@@ -2,3 +2,10 @@ MAX_LENGTH_NAME = 200
 MAX_LENGTH_MEASUREMENT_UNIT = 200
 MAX_LENGTH_COLOR = 7
 MIN_COOKING_TIME = 1
+
+POPULARITY_HALF_LIFE_DAYS = 7
+POPULARITY_WINDOW_DAYS = 90
+POPULARITY_FAVORITE_WEIGHT = 1.0
+POPULARITY_SHOPPING_CART_WEIGHT = 2.0
+POPULARITY_BATCH_SIZE = 1000
+CART_TOTALS_BATCH_SIZE = 500
@@ -0,0 +1,117 @@
+import csv
+import json
+import re
+from itertools import islice
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.cache import INGREDIENTS_VERSION, bump_version
+from recipes.constants import MAX_LENGTH_MEASUREMENT_UNIT, MAX_LENGTH_NAME
+from recipes.models import Ingredient
+
+READ_SIZE = 64 * 1024
+SEPARATORS = re.compile(r'[\s,]*')
+
+
+def read_json(file):
+    """Поэлементное чтение JSON-массива без загрузки файла целиком."""
+    decoder = json.JSONDecoder()
+    buffer = file.read(READ_SIZE).lstrip()
+    if not buffer.startswith('['):
+        raise CommandError('Файл JSON должен содержать массив.')
+    position = 1
+    while True:
+        position = SEPARATORS.match(buffer, position).end()
+        if buffer.startswith(']', position):
+            return
+        try:
+            item, position = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError:
+            chunk = file.read(READ_SIZE)
+            if not chunk:
+                raise CommandError('Некорректный файл JSON.')
+            buffer = buffer[position:] + chunk
+            position = 0
+            continue
+        # Поддерживается и формат фикстур Django: {"fields": {...}}.
+        item = item.get('fields', item) if isinstance(item, dict) else {}
+        yield item.get('name'), item.get('measurement_unit')
+
+
+def read_csv(file):
+    """Построчное чтение CSV: название, единица измерения."""
+    for row in csv.reader(file):
+        if len(row) != 2:
+            yield None, None
+        elif tuple(row) != ('name', 'measurement_unit'):
+            yield row[0], row[1]
+
+
+class Command(BaseCommand):
+    """Пакетная загрузка ингредиентов из файла JSON или CSV."""
+
+    help = 'Load ingredients data from json or csv file to DB.'
+    readers = {'.json': read_json, '.csv': read_csv}
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path', nargs='?', default='ingredients.json',
+            help='Путь к файлу .json или .csv.',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Количество строк в одном запросе к БД.',
+        )
+
+    def handle(self, *args, **options):
+        path = Path(options['path'])
+        reader = self.readers.get(path.suffix.lower())
+        if reader is None:
+            raise CommandError('Поддерживаются только файлы .json и .csv.')
+
+        inserted = existing = skipped = 0
+        with open(path, encoding='utf-8') as file:
+            rows = reader(file)
+            while batch := list(islice(rows, options['batch_size'])):
+                batch_inserted, batch_existing, batch_skipped = (
+                    self.load_batch(batch)
+                )
+                inserted += batch_inserted
+                existing += batch_existing
+                skipped += batch_skipped
+
+        if inserted:
+            bump_version(INGREDIENTS_VERSION)
+        self.stdout.write(self.style.SUCCESS(
+            f'Добавлено: {inserted}, уже были: {existing}, '
+            f'пропущено: {skipped}.'
+        ))
+
+    def load_batch(self, batch):
+        """Одна выборка существующих и одна пакетная вставка на порцию."""
+        pairs = set()
+        for name, measurement_unit in batch:
+            name = (name or '').strip()
+            measurement_unit = (measurement_unit or '').strip()
+            if (
+                name and measurement_unit
+                and len(name) <= MAX_LENGTH_NAME
+                and len(measurement_unit) <= MAX_LENGTH_MEASUREMENT_UNIT
+            ):
+                pairs.add((name, measurement_unit))
+
+        known = pairs & set(
+            Ingredient.objects.filter(
+                name__in={name for name, _ in pairs},
+            ).values_list('name', 'measurement_unit')
+        )
+        new = pairs - known
+        Ingredient.objects.bulk_create(
+            (
+                Ingredient(name=name, measurement_unit=measurement_unit)
+                for name, measurement_unit in new
+            ),
+            ignore_conflicts=True,
+        )
+        return len(new), len(known), len(batch) - len(pairs)
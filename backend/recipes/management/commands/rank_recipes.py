@@ -0,0 +1,69 @@
+from collections import defaultdict
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from api.cache import RECIPES_VERSION, bump_version
+from recipes.constants import (
+    POPULARITY_BATCH_SIZE, POPULARITY_FAVORITE_WEIGHT,
+    POPULARITY_HALF_LIFE_DAYS, POPULARITY_SHOPPING_CART_WEIGHT,
+    POPULARITY_WINDOW_DAYS
+)
+from recipes.models import Favorite, Recipe, ShoppingCart
+
+ACTIVITY = (
+    (Favorite, POPULARITY_FAVORITE_WEIGHT),
+    (ShoppingCart, POPULARITY_SHOPPING_CART_WEIGHT),
+)
+
+
+def popularity_scores(now):
+    """
+    Популярность рецептов: сумма весов добавлений в избранное
+    и в списки покупок, вклад которых вдвое падает за период
+    полураспада. Активность старше окна почти не влияет на оценку
+    и не читается.
+    """
+    since = now - timedelta(days=POPULARITY_WINDOW_DAYS)
+    half_life = timedelta(days=POPULARITY_HALF_LIFE_DAYS).total_seconds()
+    scores = defaultdict(float)
+    for model, weight in ACTIVITY:
+        rows = model.objects.filter(created__gte=since).values_list(
+            'recipe_id', 'created',
+        ).iterator(chunk_size=POPULARITY_BATCH_SIZE)
+        for recipe_id, created in rows:
+            age = (now - created).total_seconds()
+            scores[recipe_id] += weight * 0.5 ** (age / half_life)
+    return scores
+
+
+class Command(BaseCommand):
+    """Пересчёт популярности рецептов для сортировки ordering=popular."""
+
+    help = 'Recompute time-decayed recipe popularity scores.'
+
+    def handle(self, *args, **options):
+        scores = popularity_scores(timezone.now())
+        current = Recipe.objects.filter(
+            pk__in=scores.keys(),
+        ).values_list('pk', 'popularity')
+        stale = Recipe.objects.exclude(popularity=0).exclude(
+            pk__in=scores.keys(),
+        )
+        changed = [
+            Recipe(pk=pk, popularity=round(scores[pk], 6))
+            for pk, popularity in current.iterator()
+            if popularity != round(scores[pk], 6)
+        ]
+        with transaction.atomic():
+            reset = stale.update(popularity=0)
+            Recipe.objects.bulk_update(
+                changed, ('popularity',), batch_size=POPULARITY_BATCH_SIZE,
+            )
+        if changed or reset:
+            bump_version(RECIPES_VERSION)
+        self.stdout.write(
+            f'Обновлена популярность рецептов: {len(changed) + reset}'
+        )
@@ -0,0 +1,98 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Q, Sum
+
+from recipes.constants import CART_TOTALS_BATCH_SIZE
+from recipes.models import RecipeIngredient, ShoppingCart, ShoppingCartTotal
+
+User = get_user_model()
+
+
+def expected_totals(user_ids):
+    """Итоги корзин, посчитанные заново по их содержимому."""
+    rows = RecipeIngredient.objects.filter(
+        recipe__shopping_list__user_id__in=user_ids,
+    ).values_list(
+        'recipe__shopping_list__user_id', 'ingredient_id',
+        'ingredient__name', 'ingredient__measurement_unit',
+    ).annotate(total=Sum('amount')).order_by()
+    return {
+        (user_id, ingredient_id): (name, unit, total)
+        for user_id, ingredient_id, name, unit, total in rows
+    }
+
+
+@transaction.atomic
+def rebuild_totals(user_ids):
+    """
+    Приводит итоги корзин пользователей к содержимому корзин.
+    Строки пользователей блокируются, как при изменении корзины.
+    Возвращает число исправленных строк итогов.
+    """
+    list(
+        User.objects.select_for_update().filter(pk__in=user_ids)
+        .order_by('pk').values_list('pk', flat=True)
+    )
+    expected = expected_totals(user_ids)
+    to_update, to_delete = [], []
+    for total in ShoppingCartTotal.objects.filter(user_id__in=user_ids):
+        key = (total.user_id, total.ingredient_id)
+        if key not in expected:
+            to_delete.append(total.pk)
+            continue
+        values = expected.pop(key)
+        if values != (total.name, total.measurement_unit, total.amount):
+            total.name, total.measurement_unit, total.amount = values
+            to_update.append(total)
+    to_create = [
+        ShoppingCartTotal(
+            user_id=user_id, ingredient_id=ingredient_id,
+            name=name, measurement_unit=unit, amount=amount,
+        )
+        for (user_id, ingredient_id), (name, unit, amount)
+        in expected.items()
+    ]
+    ShoppingCartTotal.objects.filter(pk__in=to_delete).delete()
+    ShoppingCartTotal.objects.bulk_update(
+        to_update, ('name', 'measurement_unit', 'amount'),
+    )
+    ShoppingCartTotal.objects.bulk_create(to_create)
+    return len(to_delete) + len(to_update) + len(to_create)
+
+
+class Command(BaseCommand):
+    """
+    Пересчёт итогов списков покупок по содержимому корзин.
+
+    Исправляет расхождения после изменений в обход API, например
+    прямых правок в БД. Счётчики рецептов и пользователей
+    пересчитывает команда recount_counters.
+    """
+
+    help = 'Rebuild shopping cart totals and fix drifted rows.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user', type=int, help='id пользователя, по умолчанию все.',
+        )
+
+    def handle(self, *args, **options):
+        users = User.objects.filter(
+            Q(Exists(ShoppingCart.objects.filter(user=OuterRef('pk'))))
+            | Q(Exists(ShoppingCartTotal.objects.filter(
+                user=OuterRef('pk'),
+            ))),
+        )
+        if options['user']:
+            users = users.filter(pk=options['user'])
+        user_ids = list(users.order_by('pk').values_list('pk', flat=True))
+        fixed = 0
+        for start in range(0, len(user_ids), CART_TOTALS_BATCH_SIZE):
+            fixed += rebuild_totals(
+                user_ids[start:start + CART_TOTALS_BATCH_SIZE],
+            )
+        self.stdout.write(
+            f'Пользователей: {len(user_ids)}, '
+            f'исправлено строк итогов: {fixed}'
+        )
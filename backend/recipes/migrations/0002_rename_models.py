@@ -0,0 +1,50 @@
+# Generated by Django 4.2.7 on 2026-10-17 04:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RenameModel(
+            old_name='FavoritesList',
+            new_name='Favorite',
+        ),
+        migrations.RenameModel(
+            old_name='Ingredients',
+            new_name='Ingredient',
+        ),
+        migrations.RenameModel(
+            old_name='RecipeIngredients',
+            new_name='RecipeIngredient',
+        ),
+        migrations.RenameModel(
+            old_name='ShoppingList',
+            new_name='ShoppingCart',
+        ),
+        migrations.RenameModel(
+            old_name='Tags',
+            new_name='Tag',
+        ),
+        migrations.RenameModel(
+            old_name='Recipes',
+            new_name='Recipe',
+        ),
+        migrations.AlterModelOptions(
+            name='tag',
+            options={'ordering': ['name'], 'verbose_name': 'Тэг', 'verbose_name_plural': 'Тэги'},
+        ),
+        migrations.AlterField(
+            model_name='tag',
+            name='color',
+            field=models.CharField(choices=[('#FF0000', 'Красный'), ('#00FF00', 'Зелёный'), ('#0000FF', 'Синий'), ('#000000', 'Чёрный'), ('#00FFFF', 'Бирюзовый')], default='#FF0000', max_length=7, unique=True, verbose_name='Цвет'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='ingredient',
+            unique_together={('name', 'measurement_unit')},
+        ),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 4.2.7 on 2026-10-17 04:16
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def fill_shopping_cart_totals(apps, schema_editor):
+    RecipeIngredient = apps.get_model('recipes', 'RecipeIngredient')
+    ShoppingCartTotal = apps.get_model('recipes', 'ShoppingCartTotal')
+    db = schema_editor.connection.alias
+    rows = RecipeIngredient.objects.using(db).filter(
+        recipe__shopping_list__isnull=False,
+    ).values_list(
+        'recipe__shopping_list__user_id', 'ingredient_id',
+        'ingredient__name', 'ingredient__measurement_unit',
+    ).annotate(total_amount=models.Sum('amount')).order_by()
+    ShoppingCartTotal.objects.using(db).bulk_create(
+        ShoppingCartTotal(
+            user_id=user_id, ingredient_id=ingredient_id, name=name,
+            measurement_unit=measurement_unit, amount=amount,
+        )
+        for user_id, ingredient_id, name, measurement_unit, amount in rows
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('recipes', '0003_recipecard'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ShoppingCartTotal',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=200, verbose_name='Название ингредиента')),
+                ('measurement_unit', models.CharField(max_length=200, verbose_name='Единица измерения')),
+                ('amount', models.PositiveIntegerField(verbose_name='Количество')),
+                ('ingredient', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='shopping_cart_totals', to='recipes.ingredient', verbose_name='Ингредиент')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='shopping_cart_totals', to=settings.AUTH_USER_MODEL, verbose_name='Владелец списка покупок')),
+            ],
+            options={
+                'verbose_name': 'Итог списка покупок',
+                'verbose_name_plural': 'Итоги списков покупок',
+                'indexes': [models.Index(fields=['user', 'name'], name='shopping_cart_total_user_name')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='shoppingcarttotal',
+            constraint=models.UniqueConstraint(fields=('user', 'ingredient'), name='unique_shopping_cart_total'),
+        ),
+        migrations.RunPython(
+            fill_shopping_cart_totals, migrations.RunPython.noop,
+        ),
+    ]
@@ -0,0 +1,74 @@
+# Generated by Django 4.2.7 on 2026-10-17 04:30
+
+import django.contrib.postgres.search
+from django.db import migrations, models
+
+SEARCH_INDEX = 'recipe_search_vector'
+
+
+def fill_search_documents(apps, schema_editor):
+    Recipe = apps.get_model('recipes', 'Recipe')
+    RecipeIngredient = apps.get_model('recipes', 'RecipeIngredient')
+    db = schema_editor.connection.alias
+    ingredients = {}
+    for recipe_id, name in RecipeIngredient.objects.using(db).values_list(
+        'recipe_id', 'ingredient__name',
+    ):
+        ingredients.setdefault(recipe_id, []).append(name)
+    recipes = list(Recipe.objects.using(db).only('name', 'text'))
+    for recipe in recipes:
+        recipe.search_document = '\n'.join((
+            recipe.name, ' '.join(ingredients.get(recipe.pk, ())), recipe.text,
+        )).lower()
+    Recipe.objects.using(db).bulk_update(recipes, ('search_document',), batch_size=500)
+
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(
+        "UPDATE recipes_recipe AS recipe SET search_vector = "
+        "setweight(to_tsvector('russian', recipe.name), 'A') || "
+        "setweight(to_tsvector('russian', coalesce(("
+        "SELECT string_agg(ingredient.name, ' ') "
+        "FROM recipes_recipeingredient AS item "
+        "JOIN recipes_ingredient AS ingredient "
+        "ON ingredient.id = item.ingredient_id "
+        "WHERE item.recipe_id = recipe.id), '')), 'B') || "
+        "setweight(to_tsvector('russian', recipe.text), 'C')"
+    )
+
+
+def create_search_index(apps, schema_editor):
+    # GIN есть только в PostgreSQL, в остальных СУБД поиск идёт
+    # по search_document без индекса.
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(
+            f'CREATE INDEX {SEARCH_INDEX} ON recipes_recipe '
+            'USING GIN (search_vector)'
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(f'DROP INDEX IF EXISTS {SEARCH_INDEX}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0009_recipe_author_pub_date_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='search_document',
+            field=models.TextField(blank=True, default='', editable=False, verbose_name='Поисковый документ'),
+        ),
+        migrations.AddField(
+            model_name='recipe',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True, verbose_name='Поисковый вектор'),
+        ),
+        migrations.RunPython(fill_search_documents, migrations.RunPython.noop),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -1,9 +1,13 @@
 from django.contrib.auth import get_user_model
+from django.contrib.postgres.search import SearchVectorField
 from django.core.validators import MinValueValidator, validate_slug
 from django.db import models
+from django.db.models import Exists, OuterRef, Prefetch, Value
 
 from recipes.constants import (MAX_LENGTH_NAME, MAX_LENGTH_MEASUREMENT_UNIT,
                                MAX_LENGTH_COLOR, MIN_COOKING_TIME)
+from core.models import CounterFieldsMixin
+from users.models import Follow
 
 User = get_user_model()
 
@@ -81,7 +85,55 @@ class Ingredient(models.Model):
         return self.name
 
 
-class Recipe(models.Model):
+class RecipeQuerySet(models.QuerySet):
+    """Набор запросов рецептов с подготовкой к сериализации."""
+
+    def with_user_flags(self, user):
+        """
+        Загружает всё, что нужно для вывода страницы рецептов,
+        фиксированным числом запросов: теги, ингредиенты с единицами
+        измерения, автора с флагом подписки, флаги избранного и корзины.
+        """
+        return self.prefetch_related(
+            'tags',
+            Prefetch(
+                'recipe_ingredients',
+                queryset=RecipeIngredient.objects.select_related(
+                    'ingredient'
+                ),
+            ),
+            Prefetch(
+                'author',
+                queryset=User.objects.annotate(
+                    is_subscribed=_user_flag(Follow, user, author='pk'),
+                ),
+            ),
+        ).annotate(
+            is_favorited=_user_flag(Favorite, user, recipe='pk'),
+            is_in_shopping_cart=_user_flag(ShoppingCart, user, recipe='pk'),
+        )
+
+    def with_card(self, user):
+        """
+        Загружает предрассчитанную карточку рецепта одним запросом
+        вместе с флагами текущего пользователя.
+        """
+        return self.select_related('card').annotate(
+            is_favorited=_user_flag(Favorite, user, recipe='pk'),
+            is_in_shopping_cart=_user_flag(ShoppingCart, user, recipe='pk'),
+            is_subscribed=_user_flag(Follow, user, author='author'),
+        )
+
+
+def _user_flag(model, user, **outer_refs):
+    """Флаг наличия записи пользователя, связанной с внешним запросом."""
+    if user is None or not user.is_authenticated:
+        return Value(False)
+    lookups = {field: OuterRef(ref) for field, ref in outer_refs.items()}
+    return Exists(model.objects.filter(user=user, **lookups))
+
+
+class Recipe(CounterFieldsMixin, models.Model):
     """Модель рецептов."""
 
     author = models.ForeignKey(
@@ -108,6 +160,28 @@ class Recipe(models.Model):
         blank=False,
         help_text='Прикрепите изображение',
     )
+    image_webp = models.ImageField(
+        'Изображение в WebP',
+        upload_to='recipes/webp/',
+        blank=True,
+        editable=False,
+    )
+    image_thumbnail = models.ImageField(
+        'Миниатюра изображения',
+        upload_to='recipes/thumbnails/',
+        blank=True,
+        editable=False,
+    )
+    image_width = models.PositiveIntegerField(
+        'Ширина изображения в кратком выводе',
+        null=True,
+        editable=False,
+    )
+    image_height = models.PositiveIntegerField(
+        'Высота изображения в кратком выводе',
+        null=True,
+        editable=False,
+    )
     ingredients = models.ManyToManyField(
         Ingredient,
         blank=False,
@@ -137,15 +211,62 @@ class Recipe(models.Model):
         'Дата публикации',
         auto_now_add=True,
     )
+    favorites_count = models.PositiveIntegerField(
+        'В избранном',
+        default=0,
+        editable=False,
+    )
+    in_carts_count = models.PositiveIntegerField(
+        'В списках покупок',
+        default=0,
+        editable=False,
+    )
+    popularity = models.FloatField(
+        'Популярность',
+        default=0,
+        editable=False,
+    )
+    search_document = models.TextField(
+        'Поисковый документ',
+        blank=True,
+        default='',
+        editable=False,
+    )
+    search_vector = SearchVectorField(
+        'Поисковый вектор',
+        null=True,
+        editable=False,
+    )
+
+    counter_fields = ('favorites_count', 'in_carts_count', 'popularity')
+    objects = RecipeQuerySet.as_manager()
 
     class Meta:
         ordering = ('-pub_date', )
         verbose_name = 'Рецепт'
         verbose_name_plural = 'Рецепты'
+        indexes = [
+            models.Index(
+                fields=('-popularity', '-pub_date'),
+                name='recipe_popularity',
+            ),
+            models.Index(
+                fields=('author', '-pub_date'),
+                name='recipe_author_pub_date',
+            ),
+            models.Index(
+                fields=('-pub_date', '-id'),
+                name='recipe_pub_date_id',
+            ),
+        ]
 
     def __str__(self):
         return self.name
 
+    def image_variant(self, variant):
+        """Вариант изображения, пока он не готов — исходное изображение."""
+        return getattr(self, variant) or self.image
+
 
 class RecipeIngredient(models.Model):
     """Модель ингредиентов рецепта."""
@@ -188,6 +309,11 @@ class ShoppingCart(models.Model):
         related_name='shopping_list',
         verbose_name='Рецепт из списка покупок',
     )
+    created = models.DateTimeField(
+        'Дата добавления',
+        auto_now_add=True,
+        db_index=True,
+    )
 
     class Meta:
         verbose_name = 'Список покупок'
@@ -204,6 +330,51 @@ class ShoppingCart(models.Model):
                 f'из корзины покупок пользователя {self.user}')
 
 
+class ShoppingCartTotal(models.Model):
+    """Модель агрегированного списка покупок пользователя."""
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='shopping_cart_totals',
+        verbose_name='Владелец списка покупок',
+    )
+    ingredient = models.ForeignKey(
+        Ingredient,
+        on_delete=models.CASCADE,
+        related_name='shopping_cart_totals',
+        verbose_name='Ингредиент',
+    )
+    name = models.CharField(
+        'Название ингредиента',
+        max_length=MAX_LENGTH_NAME,
+    )
+    measurement_unit = models.CharField(
+        'Единица измерения',
+        max_length=MAX_LENGTH_MEASUREMENT_UNIT,
+    )
+    amount = models.PositiveIntegerField('Количество')
+
+    class Meta:
+        verbose_name = 'Итог списка покупок'
+        verbose_name_plural = 'Итоги списков покупок'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'ingredient'],
+                name='unique_shopping_cart_total'
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=['user', 'name'],
+                name='shopping_cart_total_user_name',
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.name}, {self.amount} {self.measurement_unit}'
+
+
 class Favorite(models.Model):
     """Модель подписки."""
 
@@ -220,6 +391,11 @@ class Favorite(models.Model):
         related_name='favorites',
         verbose_name='Избранные рецепты',
     )
+    created = models.DateTimeField(
+        'Дата добавления',
+        auto_now_add=True,
+        db_index=True,
+    )
 
     class Meta:
         verbose_name = 'Список избранных рецептов'
@@ -234,3 +410,27 @@ class Favorite(models.Model):
     def __str__(self):
         return (f'Избранный рецепт "{self.recipe.name}" '
                 f'пользователя {self.user}')
+
+
+class RecipeCard(models.Model):
+    """Предрассчитанная карточка рецепта для чтения."""
+
+    recipe = models.OneToOneField(
+        Recipe,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='card',
+        verbose_name='Рецепт',
+    )
+    data = models.JSONField('Данные карточки')
+    updated = models.DateTimeField(
+        'Дата обновления',
+        auto_now=True,
+    )
+
+    class Meta:
+        verbose_name = 'Карточка рецепта'
+        verbose_name_plural = 'Карточки рецептов'
+
+    def __str__(self):
+        return f'Карточка рецепта {self.recipe_id}'
@@ -0,0 +1,119 @@
+import json
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.test import AsyncRequestFactory, TestCase
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from api.async_views import (
+    IngredientDetailView, IngredientListView, RecipeDetailView,
+    TagDetailView, TagListView
+)
+from recipes.models import Ingredient, Recipe, Tag
+from users.models import User
+
+
+class AsyncReadViewsTest(TestCase):
+    """Асинхронные представления отвечают так же, как ViewSet."""
+
+    factory = AsyncRequestFactory()
+
+    @classmethod
+    def setUpTestData(cls):
+        author = User.objects.create_user(
+            email='author@example.com', username='author',
+            first_name='Author', last_name='Author', password='secret',
+        )
+        cls.tag = Tag.objects.create(name='Обед', slug='lunch')
+        cls.ingredient = Ingredient.objects.create(
+            name='Соль', measurement_unit='г',
+        )
+        Ingredient.objects.create(name='Сахар', measurement_unit='г')
+        cls.recipe = Recipe.objects.create(
+            author=author, name='Суп', text='Описание',
+            image='recipes/recipe.png', cooking_time=10,
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    async def call(self, view, path, data=None, **kwargs):
+        request = self.factory.get(
+            path, data, headers=kwargs.pop('headers', None),
+        )
+        return await view.as_view()(request, **kwargs)
+
+    async def sync_get(self, path, data=None):
+        return await sync_to_async(self.client.get)(path, data)
+
+    async def assert_same(self, response, path, data=None):
+        expected = await self.sync_get(path, data)
+        self.assertEqual(response.status_code, expected.status_code)
+        self.assertEqual(json.loads(response.content), expected.json())
+
+    async def test_tags(self):
+        response = await self.call(TagListView, '/api/tags/')
+        await self.assert_same(response, '/api/tags/')
+        response = await self.call(TagDetailView, '/', pk=self.tag.pk)
+        await self.assert_same(response, f'/api/tags/{self.tag.pk}/')
+        response = await self.call(TagDetailView, '/', pk=0)
+        await self.assert_same(response, '/api/tags/0/')
+
+    async def test_ingredients(self):
+        response = await self.call(
+            IngredientListView, '/api/ingredients/', {'name': 'Со'},
+        )
+        await self.assert_same(response, '/api/ingredients/', {'name': 'Со'})
+        self.assertEqual(len(json.loads(response.content)), 1)
+        response = await self.call(
+            IngredientDetailView, '/', pk=self.ingredient.pk,
+        )
+        await self.assert_same(
+            response, f'/api/ingredients/{self.ingredient.pk}/',
+        )
+
+    async def test_invalid_ingredient_filter(self):
+        response = await self.call(
+            IngredientListView, '/api/ingredients/', {'name': 'С\x00'},
+        )
+        self.assertEqual(response.status_code, 400)
+        await self.assert_same(
+            response, '/api/ingredients/', {'name': 'С\x00'},
+        )
+
+    async def test_recipe(self):
+        path = f'/api/recipes/{self.recipe.pk}/'
+        response = await self.call(RecipeDetailView, path, pk=self.recipe.pk)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        await self.assert_same(response, path)
+        response = await self.call(RecipeDetailView, path, pk=0)
+        self.assertEqual(response.status_code, 404)
+
+    async def test_recipe_not_modified(self):
+        path = f'/api/recipes/{self.recipe.pk}/'
+        response = await self.call(RecipeDetailView, path, pk=self.recipe.pk)
+        response = await self.call(
+            RecipeDetailView, path, pk=self.recipe.pk,
+            headers={'If-None-Match': response['ETag']},
+        )
+        self.assertEqual(response.status_code, 304)
+
+    async def test_recipe_shares_anonymous_cache(self):
+        path = f'/api/recipes/{self.recipe.pk}/'
+        self.assertEqual((await self.sync_get(path))['X-Cache'], 'MISS')
+        response = await self.call(RecipeDetailView, path, pk=self.recipe.pk)
+        self.assertEqual(response['X-Cache'], 'HIT')
+        await self.assert_same(response, path)
+
+    async def test_recipe_not_cached_for_user(self):
+        user = await User.objects.aget(username='author')
+        token, _ = await Token.objects.aget_or_create(user=user)
+        path = f'/api/recipes/{self.recipe.pk}/'
+        response = await self.call(
+            RecipeDetailView, path, pk=self.recipe.pk,
+            headers={'Authorization': f'Token {token.key}'},
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('X-Cache', response)
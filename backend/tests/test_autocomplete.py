@@ -0,0 +1,71 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from api.autocomplete import IngredientAutocomplete
+from api.constants import AUTOCOMPLETE_MAX_LIMIT
+from recipes.models import Ingredient
+
+
+class IngredientAutocompleteTest(TestCase):
+    """Подсказки ингредиентов из индекса в памяти процесса."""
+
+    @classmethod
+    def setUpTestData(cls):
+        Ingredient.objects.bulk_create(
+            Ingredient(name=name, measurement_unit='г')
+            for name in (
+                'Соль', 'Солод', 'Сахар', 'Морская соль', 'Фасоль',
+                'Перец', *(f'Специя {number}' for number in range(60)),
+            )
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.autocomplete = IngredientAutocomplete()
+
+    def names(self, query, limit=10):
+        return [
+            item['name'] for item in self.autocomplete.search(query, limit)
+        ]
+
+    def test_prefix_before_substring(self):
+        self.assertEqual(
+            self.names('сол'), ['Солод', 'Соль', 'Морская соль', 'Фасоль'],
+        )
+
+    def test_case_and_spaces(self):
+        self.assertEqual(self.names('  СОЛЬ ', 2), ['Соль', 'Морская соль'])
+
+    def test_limit(self):
+        self.assertEqual(self.names('сол', 1), ['Солод'])
+        self.assertEqual(len(self.names('специя', 5)), 5)
+        self.assertEqual(self.names('нет такого'), [])
+
+    def test_reloads_only_on_version_change(self):
+        self.names('сол')
+        with CaptureQueriesContext(connection) as context:
+            self.names('пер')
+        self.assertEqual(len(context.captured_queries), 0)
+        with self.captureOnCommitCallbacks(execute=True):
+            Ingredient.objects.create(name='Сольвент', measurement_unit='г')
+        self.assertIn('Сольвент', self.names('соль'))
+
+    def test_endpoint(self):
+        client = APIClient()
+        response = client.get(
+            '/api/ingredients/autocomplete/', {'name': 'сах'},
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [item['name'] for item in response.data], ['Сахар'],
+        )
+        self.assertEqual(set(response.data[0]), {
+            'id', 'name', 'measurement_unit',
+        })
+        response = client.get(
+            '/api/ingredients/autocomplete/', {'name': 'с', 'limit': 1000},
+        )
+        self.assertEqual(len(response.data), AUTOCOMPLETE_MAX_LIMIT)
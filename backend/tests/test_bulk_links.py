@@ -0,0 +1,129 @@
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from recipes.models import Favorite, Recipe, ShoppingCart
+from users.models import Follow, User
+
+
+class BulkLinksTest(TestCase):
+    """Пакетные избранное, корзина и подписки: статусы и счётчики."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user, cls.author, cls.other = (
+            User.objects.create_user(
+                email=f'{name}@example.com', username=name,
+                first_name=name, last_name=name, password='secret',
+            )
+            for name in ('reader', 'author', 'other')
+        )
+        cls.first, cls.second, cls.third = (
+            Recipe.objects.create(
+                author=cls.author, name=name, text='Описание',
+                image='recipes/recipe.png', cooking_time=10,
+            )
+            for name in ('Суп', 'Борщ', 'Каша')
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def bulk(self, path, add=(), remove=()):
+        response = self.client.post(path, {
+            'add': list(add), 'remove': list(remove),
+        }, format='json')
+        self.assertEqual(response.status_code, 200)
+        return {
+            operation: [(item['id'], item['status']) for item in items]
+            for operation, items in response.data.items()
+        }
+
+    def assert_counters(self, field, expected):
+        self.assertEqual(
+            dict(Recipe.objects.values_list('name', field)), expected,
+        )
+
+    def test_favorites(self):
+        Favorite.objects.create(user=self.user, recipe=self.second)
+        Recipe.objects.filter(pk=self.second.pk).update(favorites_count=1)
+        result = self.bulk(
+            '/api/recipes/bulk_favorite/',
+            add=(self.first.pk, self.second.pk, 99999, self.first.pk),
+            remove=(self.third.pk,),
+        )
+        self.assertEqual(result, {
+            'add': [
+                (self.first.pk, 'added'), (self.second.pk, 'exists'),
+                (99999, 'not_found'),
+            ],
+            'remove': [(self.third.pk, 'absent')],
+        })
+        self.assert_counters(
+            'favorites_count', {'Суп': 1, 'Борщ': 1, 'Каша': 0},
+        )
+        result = self.bulk(
+            '/api/recipes/bulk_favorite/',
+            remove=(self.first.pk, self.second.pk, 99999),
+        )
+        self.assertEqual(result['remove'], [
+            (self.first.pk, 'removed'), (self.second.pk, 'removed'),
+            (99999, 'not_found'),
+        ])
+        self.assert_counters(
+            'favorites_count', {'Суп': 0, 'Борщ': 0, 'Каша': 0},
+        )
+        self.assertFalse(Favorite.objects.exists())
+
+    def test_shopping_cart(self):
+        self.bulk(
+            '/api/recipes/bulk_shopping_cart/',
+            add=(self.first.pk, self.third.pk),
+        )
+        self.bulk(
+            '/api/recipes/bulk_shopping_cart/',
+            add=(self.second.pk,), remove=(self.first.pk,),
+        )
+        self.assert_counters(
+            'in_carts_count', {'Суп': 0, 'Борщ': 1, 'Каша': 1},
+        )
+        self.assertEqual(
+            set(ShoppingCart.objects.values_list('recipe__name', flat=True)),
+            {'Борщ', 'Каша'},
+        )
+
+    def test_subscriptions(self):
+        result = self.bulk(
+            '/api/users/bulk_subscribe/', add=(self.author.pk, self.other.pk),
+        )
+        self.assertEqual(result['add'], [
+            (self.author.pk, 'added'), (self.other.pk, 'added'),
+        ])
+        result = self.bulk(
+            '/api/users/bulk_subscribe/',
+            add=(self.author.pk,), remove=(self.other.pk,),
+        )
+        self.assertEqual(result, {
+            'add': [(self.author.pk, 'exists')],
+            'remove': [(self.other.pk, 'removed')],
+        })
+        self.assertEqual(
+            dict(User.objects.values_list('username', 'followers_count')),
+            {'reader': 0, 'author': 1, 'other': 0},
+        )
+        self.assertEqual(Follow.objects.count(), 1)
+
+    def test_invalid(self):
+        for path, data in (
+            ('/api/users/bulk_subscribe/', {'add': [self.user.pk]}),
+            ('/api/recipes/bulk_favorite/', {
+                'add': [self.first.pk], 'remove': [self.first.pk],
+            }),
+        ):
+            with self.subTest(path=path):
+                response = self.client.post(path, data, format='json')
+                self.assertEqual(response.status_code, 400)
+        self.assertFalse(Follow.objects.exists())
+        self.assertFalse(Favorite.objects.exists())
@@ -0,0 +1,97 @@
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient, APIRequestFactory
+
+from api.serializers import GetRecipeSerializer
+from recipes.models import (
+    Favorite, Ingredient, Recipe, RecipeCard, RecipeIngredient, Tag
+)
+from users.models import User
+
+
+class RecipeCardTest(TestCase):
+    """Карточки рецептов совпадают с полным выводом и не устаревают."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(
+            email='author@example.com', username='author',
+            first_name='Author', last_name='Author', password='secret',
+        )
+        cls.reader = User.objects.create_user(
+            email='reader@example.com', username='reader',
+            first_name='Reader', last_name='Reader', password='secret',
+        )
+        cls.tag = Tag.objects.create(name='Обед', slug='lunch')
+        cls.ingredient = Ingredient.objects.create(
+            name='Соль', measurement_unit='г',
+        )
+        cls.recipe = Recipe.objects.create(
+            author=cls.author, name='Суп', text='Описание',
+            image='recipes/recipe.png', cooking_time=10,
+        )
+        cls.recipe.tags.set([cls.tag])
+        RecipeIngredient.objects.create(
+            recipe=cls.recipe, ingredient=cls.ingredient, amount=5,
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.reader)
+
+    def get_recipe(self):
+        response = self.client.get(f'/api/recipes/{self.recipe.pk}/')
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_same_as_full_serializer(self):
+        Favorite.objects.create(user=self.reader, recipe=self.recipe)
+        data = self.get_recipe()
+        self.assertTrue(RecipeCard.objects.filter(recipe=self.recipe).exists())
+        request = APIRequestFactory().get('/')
+        request.user = self.reader
+        expected = GetRecipeSerializer(
+            Recipe.objects.with_user_flags(self.reader).get(),
+            context={'request': request},
+        ).data
+        self.assertEqual(data, expected)
+        self.assertTrue(data['is_favorited'])
+
+    def test_user_flags_are_not_shared(self):
+        Favorite.objects.create(user=self.reader, recipe=self.recipe)
+        self.assertTrue(self.get_recipe()['is_favorited'])
+        self.client.force_authenticate(self.author)
+        self.assertFalse(self.get_recipe()['is_favorited'])
+
+    def assert_card_dropped(self):
+        self.assertFalse(
+            RecipeCard.objects.filter(recipe=self.recipe).exists(),
+        )
+
+    def test_tag_change(self):
+        self.get_recipe()
+        self.tag.name = 'Ужин'
+        self.tag.save()
+        self.assert_card_dropped()
+        self.assertEqual(self.get_recipe()['tags'][0]['name'], 'Ужин')
+
+    def test_ingredient_change(self):
+        self.get_recipe()
+        self.ingredient.name = 'Перец'
+        self.ingredient.save()
+        self.assert_card_dropped()
+        self.assertEqual(self.get_recipe()['ingredients'][0]['name'], 'Перец')
+
+    def test_author_change(self):
+        self.get_recipe()
+        self.author.first_name = 'Автор'
+        self.author.save()
+        self.assert_card_dropped()
+        self.assertEqual(self.get_recipe()['author']['first_name'], 'Автор')
+
+    def test_recipe_tags_change(self):
+        self.get_recipe()
+        self.recipe.tags.clear()
+        self.assert_card_dropped()
+        self.assertEqual(self.get_recipe()['tags'], [])
@@ -0,0 +1,85 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from recipes.models import Favorite, Ingredient, Recipe, Tag
+from users.models import User
+
+
+class ConditionalRequestsTest(TestCase):
+    """ETag и Last-Modified по версиям данных, ответ 304 без БД."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            email='reader@example.com', username='reader',
+            first_name='Reader', last_name='Reader', password='secret',
+        )
+        cls.tag = Tag.objects.create(name='Обед', slug='lunch')
+        Ingredient.objects.create(name='Соль', measurement_unit='г')
+        cls.recipe = Recipe.objects.create(
+            author=cls.user, name='Суп', text='Описание',
+            image='recipes/recipe.png', cooking_time=10,
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def assert_not_modified(self, path, **headers):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(path, headers=headers)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(context.captured_queries, [])
+        return response
+
+    def test_not_modified(self):
+        for path in (
+            '/api/recipes/', f'/api/recipes/{self.recipe.pk}/',
+            '/api/tags/', f'/api/tags/{self.tag.pk}/', '/api/ingredients/',
+        ):
+            with self.subTest(path=path):
+                response = self.client.get(path)
+                self.assertEqual(response.status_code, 200)
+                self.assertIn('Authorization', response['Vary'])
+                self.assert_not_modified(
+                    path, **{'If-None-Match': response['ETag']},
+                )
+                self.assert_not_modified(
+                    path, **{'If-Modified-Since': response['Last-Modified']},
+                )
+
+    def test_etag_depends_on_query(self):
+        first = self.client.get('/api/recipes/', {'limit': 1})
+        second = self.client.get('/api/recipes/', {'limit': 2})
+        self.assertNotEqual(first['ETag'], second['ETag'])
+
+    def test_change_after_commit(self):
+        etag = self.client.get('/api/tags/')['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            Tag.objects.create(name='Ужин', slug='dinner', color=Tag.BLUE)
+        response = self.client.get(
+            '/api/tags/', headers={'If-None-Match': etag},
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data), 2)
+
+    def test_user_flags_change_etag(self):
+        self.client.force_authenticate(self.user)
+        path = f'/api/recipes/{self.recipe.pk}/'
+        etag = self.client.get(path)['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(f'{path}favorite/')
+        response = self.client.get(path, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.data['is_favorited'])
+        self.assertTrue(Favorite.objects.exists())
+
+    def test_etag_differs_per_user(self):
+        anonymous = self.client.get('/api/recipes/')['ETag']
+        self.client.force_authenticate(self.user)
+        self.assertNotEqual(
+            self.client.get('/api/recipes/')['ETag'], anonymous,
+        )
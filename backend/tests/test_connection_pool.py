@@ -0,0 +1,134 @@
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from api.constants import DB_CONNECTIONS, DB_STATS_FLUSH_INTERVAL
+from api.postgresql.pool import ConnectionPool, ConnectionStats, PoolTimeout
+
+
+class FakeCursor:
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+    def execute(self, sql):
+        if self.connection.broken:
+            raise OSError('server closed the connection')
+
+
+class FakeConnection:
+    """Соединение драйвера с тем, что использует пул."""
+
+    def __init__(self):
+        self.closed = 0
+        self.broken = False
+        self.rollbacks = 0
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def rollback(self):
+        if self.broken:
+            raise OSError('server closed the connection')
+        self.rollbacks += 1
+
+    def close(self):
+        self.closed = 1
+
+
+class ConnectionPoolTest(SimpleTestCase):
+
+    def setUp(self):
+        self.pool = ConnectionPool(size=2, timeout=0.05)
+        self.created = []
+
+    def connect(self):
+        entry = (FakeConnection(), 'isolation')
+        self.created.append(entry)
+        return entry
+
+    def test_reuses_released_connection(self):
+        entry = self.pool.acquire(self.connect)
+        self.pool.release(entry)
+        self.assertIs(self.pool.acquire(self.connect), entry)
+        self.assertEqual(len(self.created), 1)
+        # Незавершённая транзакция откатывается при возврате в пул.
+        self.assertEqual(entry[0].rollbacks, 1)
+
+    def test_timeout_when_exhausted(self):
+        self.pool.acquire(self.connect)
+        self.pool.acquire(self.connect)
+        with self.assertRaises(PoolTimeout):
+            self.pool.acquire(self.connect)
+
+    def test_release_frees_slot(self):
+        first = self.pool.acquire(self.connect)
+        self.pool.acquire(self.connect)
+        self.pool.release(first)
+        self.assertIs(self.pool.acquire(self.connect), first)
+
+    def test_unusable_connection_is_dropped(self):
+        entry = self.pool.acquire(self.connect)
+        self.pool.release(entry, usable=False)
+        self.assertEqual(entry[0].closed, 1)
+        self.assertIsNot(self.pool.acquire(self.connect), entry)
+        self.assertEqual(len(self.created), 2)
+
+    def test_failed_rollback_drops_connection(self):
+        entry = self.pool.acquire(self.connect)
+        entry[0].broken = True
+        self.pool.release(entry)
+        self.assertEqual(entry[0].closed, 1)
+        self.assertIsNot(self.pool.acquire(self.connect), entry)
+
+    def test_closed_idle_connection_is_skipped(self):
+        entry = self.pool.acquire(self.connect)
+        self.pool.release(entry)
+        entry[0].closed = 1
+        self.assertIsNot(self.pool.acquire(self.connect), entry)
+
+    def test_stale_connection_is_checked(self):
+        alive = self.pool.acquire(self.connect)
+        broken = self.pool.acquire(self.connect)
+        self.pool.release(alive)
+        self.pool.release(broken)
+        broken[0].broken = True
+        with mock.patch('api.postgresql.pool.DB_POOL_CHECK_INTERVAL', 0):
+            self.assertIs(self.pool.acquire(self.connect), alive)
+        self.assertEqual(broken[0].closed, 1)
+
+    def test_failed_connect_frees_slot(self):
+        with self.assertRaises(OSError):
+            self.pool.acquire(mock.Mock(side_effect=OSError))
+        self.pool.acquire(self.connect)
+        self.pool.acquire(self.connect)
+
+
+@mock.patch('api.postgresql.pool.incr_counter')
+class ConnectionStatsTest(SimpleTestCase):
+
+    def test_flushes_by_interval(self, incr_counter):
+        stats = ConnectionStats()
+        stats.record(0.001)
+        incr_counter.assert_not_called()
+        with mock.patch(
+            'api.postgresql.pool.time.monotonic',
+            return_value=stats._flushed + DB_STATS_FLUSH_INTERVAL,
+        ):
+            stats.record(0.001)
+        incr_counter.assert_any_call(DB_CONNECTIONS, 2)
+
+    def test_flush(self, incr_counter):
+        stats = ConnectionStats()
+        stats.record(0.001)
+        stats.flush()
+        incr_counter.assert_any_call(DB_CONNECTIONS, 1)
+        incr_counter.reset_mock()
+        stats.flush()
+        incr_counter.assert_not_called()
@@ -0,0 +1,91 @@
+import shutil
+import tempfile
+from unittest import mock
+
+from django.db import DatabaseError
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from recipes.models import Ingredient, Recipe, Tag
+from tests.utils import image_payload
+from users.models import User
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class RecipeCreateTransactionTest(TestCase):
+    """Рецепт и счётчик автора сохраняются вместе или не сохраняются."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(
+            email='author@example.com', username='author',
+            first_name='Author', last_name='Author', password='secret',
+        )
+        cls.tag = Tag.objects.create(name='Обед', slug='lunch')
+        cls.ingredient = Ingredient.objects.create(
+            name='Соль', measurement_unit='г',
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.author)
+
+    def create_recipe(self):
+        return self.client.post('/api/recipes/', {
+            'name': 'Суп', 'text': 'Описание', 'cooking_time': 10,
+            'image': image_payload(), 'tags': [self.tag.pk],
+            'ingredients': [{'id': self.ingredient.pk, 'amount': 5}],
+        }, format='json')
+
+    def test_created(self):
+        self.assertEqual(self.create_recipe().status_code, 201)
+        self.author.refresh_from_db()
+        self.assertEqual(self.author.recipes_count, 1)
+
+    def test_failure_after_insert_rolls_back(self):
+        with mock.patch(
+            'api.serializers.update_search_documents',
+            side_effect=DatabaseError,
+        ), self.assertRaises(DatabaseError):
+            self.create_recipe()
+        self.assertFalse(Recipe.objects.exists())
+        self.author.refresh_from_db()
+        self.assertEqual(self.author.recipes_count, 0)
+
+
+class CounterFieldsTest(TestCase):
+    """Полное сохранение не записывает прочитанные ранее счётчики."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(
+            email='author@example.com', username='author',
+            first_name='Author', last_name='Author', password='secret',
+        )
+        cls.recipe = Recipe.objects.create(
+            author=cls.author, name='Суп', text='Описание',
+            image='recipes/recipe.png', cooking_time=10,
+        )
+
+    def test_full_save_keeps_counters(self):
+        recipe = Recipe.objects.get(pk=self.recipe.pk)
+        author = User.objects.get(pk=self.author.pk)
+        Recipe.objects.filter(pk=recipe.pk).update(favorites_count=7)
+        User.objects.filter(pk=author.pk).update(followers_count=3)
+        recipe.name = 'Борщ'
+        recipe.save()
+        author.first_name = 'Автор'
+        author.save()
+        recipe.refresh_from_db()
+        author.refresh_from_db()
+        self.assertEqual((recipe.name, recipe.favorites_count), ('Борщ', 7))
+        self.assertEqual(
+            (author.first_name, author.followers_count), ('Автор', 3),
+        )
@@ -0,0 +1,79 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from api.constants import FEED_TIMELINE_SIZE
+from recipes.models import Recipe
+from users.models import Follow, User
+
+
+class FeedTimelineTest(TestCase):
+    """Лента подписок пересобирается только при изменении её состава."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.reader, cls.followed, cls.other = (
+            User.objects.create_user(
+                email=f'{name}@example.com', username=name,
+                first_name=name, last_name=name, password='secret',
+            )
+            for name in ('reader', 'followed', 'other')
+        )
+        Follow.objects.create(user=cls.reader, author=cls.followed)
+        cls.followed_recipe = cls.create_recipe(cls.followed)
+        cls.other_recipe = cls.create_recipe(cls.other)
+
+    @staticmethod
+    def create_recipe(author):
+        return Recipe.objects.create(
+            author=author, name='Рецепт', text='Описание',
+            image='recipes/recipe.png', cooking_time=10,
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.reader)
+
+    def get_feed(self):
+        """Id рецептов ленты и признак пересборки закешированной ленты."""
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get('/api/recipes/feed/', {'limit': 10})
+        self.assertEqual(response.status_code, 200)
+        rebuilt = any(
+            f'LIMIT {FEED_TIMELINE_SIZE}' in query['sql']
+            for query in context.captured_queries
+        )
+        return [item['id'] for item in response.data['results']], rebuilt
+
+    def test_unrelated_changes_keep_timeline(self):
+        self.assertEqual(self.get_feed(), ([self.followed_recipe.pk], True))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.other_recipe.name = 'Другое название'
+            self.other_recipe.save()
+            self.followed_recipe.text = 'Новое описание'
+            self.followed_recipe.save()
+            self.create_recipe(self.other)
+            self.client.post(
+                f'/api/recipes/{self.other_recipe.pk}/favorite/',
+            )
+        self.assertEqual(self.get_feed(), ([self.followed_recipe.pk], False))
+
+    def test_new_recipe_of_followed_author(self):
+        self.get_feed()
+        with self.captureOnCommitCallbacks(execute=True):
+            recipe = self.create_recipe(self.followed)
+        self.assertEqual(
+            self.get_feed(), ([recipe.pk, self.followed_recipe.pk], True),
+        )
+
+    def test_follow_changes_timeline(self):
+        self.get_feed()
+        self.client.post(f'/api/users/{self.other.pk}/subscribe/')
+        recipes, rebuilt = self.get_feed()
+        self.assertTrue(rebuilt)
+        self.assertEqual(
+            set(recipes), {self.followed_recipe.pk, self.other_recipe.pk},
+        )
@@ -0,0 +1,83 @@
+import shutil
+import tempfile
+from io import BytesIO
+from unittest import mock
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.test import TestCase, override_settings
+from PIL import Image
+from rest_framework.test import APIClient
+
+from api.images import process_recipe_image
+from api.views import RecipeViewSet
+from recipes.models import Recipe
+from tests.utils import image_payload
+from users.models import User
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class RecipeImageUpdateTest(TestCase):
+    """Изменение рецепта не затирает результат обработки изображения."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(
+            email='author@example.com', username='author',
+            first_name='Author', last_name='Author', password='secret',
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        buffer = BytesIO()
+        Image.new('RGB', (40, 30), 'blue').save(buffer, format='PNG')
+        self.recipe = Recipe.objects.create(
+            author=self.author, name='Рецепт', text='Описание',
+            image=default_storage.save(
+                'recipes/source.png', ContentFile(buffer.getvalue()),
+            ),
+            cooking_time=10,
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.author)
+
+    def patch(self, data):
+        response = self.client.patch(
+            f'/api/recipes/{self.recipe.pk}/', data, format='json',
+        )
+        self.assertEqual(response.status_code, 200)
+        self.recipe.refresh_from_db()
+
+    def test_patch_during_processing(self):
+        get_object = RecipeViewSet.get_object
+
+        def load_then_process(view):
+            # Рецепт загружен до того, как обработчик записал варианты.
+            recipe = get_object(view)
+            self.assertTrue(process_recipe_image(recipe.pk))
+            return recipe
+
+        with mock.patch.object(
+            RecipeViewSet, 'get_object', load_then_process,
+        ):
+            self.patch({'name': 'Новое название'})
+        self.assertEqual(self.recipe.name, 'Новое название')
+        for field in ('image', 'image_webp', 'image_thumbnail'):
+            name = getattr(self.recipe, field).name
+            self.assertTrue(name)
+            self.assertTrue(default_storage.exists(name), field)
+
+    def test_new_image_drops_old_variants(self):
+        process_recipe_image(self.recipe.pk)
+        self.patch({'image': image_payload()})
+        self.assertFalse(self.recipe.image_webp)
+        self.assertFalse(self.recipe.image_thumbnail)
+        self.assertEqual(
+            (self.recipe.image_width, self.recipe.image_height), (4, 3),
+        )
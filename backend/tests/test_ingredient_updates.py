@@ -0,0 +1,70 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from recipes.models import Ingredient, Recipe, RecipeIngredient
+from users.models import User
+
+
+class RecipeIngredientWritesTest(TestCase):
+    """
+    Число запросов изменения и удаления рецепта не зависит
+    от числа затронутых ингредиентов.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(
+            email='author@example.com', username='author',
+            first_name='Author', last_name='Author', password='secret',
+        )
+        cls.ingredients = Ingredient.objects.bulk_create(
+            Ingredient(name=f'Ингредиент {number}', measurement_unit='г')
+            for number in range(20)
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.author)
+
+    def create_recipe(self, size):
+        recipe = Recipe.objects.create(
+            author=self.author, name='Рецепт', text='Описание',
+            image='recipes/recipe.png', cooking_time=10,
+        )
+        RecipeIngredient.objects.bulk_create(
+            RecipeIngredient(recipe=recipe, ingredient=ingredient, amount=1)
+            for ingredient in self.ingredients[:size]
+        )
+        return recipe
+
+    def count_queries(self, method, recipe, data=None):
+        with CaptureQueriesContext(connection) as context:
+            response = getattr(self.client, method)(
+                f'/api/recipes/{recipe.pk}/', data, format='json',
+            )
+        self.assertLess(response.status_code, 300)
+        return len(context.captured_queries)
+
+    def keep_two_ingredients(self, recipe):
+        return self.count_queries('patch', recipe, {'ingredients': [
+            {'id': ingredient.pk, 'amount': 1}
+            for ingredient in self.ingredients[:2]
+        ]})
+
+    def test_patch_removing_ingredients(self):
+        self.assertEqual(
+            self.keep_two_ingredients(self.create_recipe(3)),
+            self.keep_two_ingredients(self.create_recipe(20)),
+        )
+        self.assertEqual(RecipeIngredient.objects.count(), 4)
+
+    def test_delete(self):
+        # Первый запрос загружает теги в память процесса.
+        self.count_queries('delete', self.create_recipe(1))
+        self.assertEqual(
+            self.count_queries('delete', self.create_recipe(2)),
+            self.count_queries('delete', self.create_recipe(20)),
+        )
+        self.assertFalse(RecipeIngredient.objects.exists())
@@ -0,0 +1,97 @@
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from recipes.models import Recipe
+from users.models import User
+
+
+class KeysetPaginationTest(TestCase):
+    """Обход по курсору выдаёт каждую запись ровно один раз."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(
+            email='author@example.com', username='author',
+            first_name='Author', last_name='Author', password='secret',
+        )
+        now = timezone.now()
+        for number in range(23):
+            recipe = Recipe.objects.create(
+                author=cls.author, name=f'Рецепт {number}', text='Описание',
+                image='recipes/recipe.png', cooking_time=10,
+            )
+            # Повторяющиеся даты и популярность проверяют добор по id.
+            Recipe.objects.filter(pk=recipe.pk).update(
+                pub_date=now - timedelta(minutes=number // 4),
+                popularity=number % 3,
+            )
+        for number in range(7):
+            User.objects.create_user(
+                email=f'user{number}@example.com', username=f'user{number}',
+                first_name='User', last_name=str(number), password='secret',
+            )
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def walk(self, path, params):
+        ids, url, pages = [], path, 0
+        params = {**params, 'cursor': '', 'limit': 5}
+        while url:
+            response = self.client.get(url, params)
+            self.assertEqual(response.status_code, 200)
+            self.assertNotIn('count', response.data)
+            ids += [item['id'] for item in response.data['results']]
+            url, params, pages = response.data['next'], None, pages + 1
+        return ids, pages
+
+    def test_recipes(self):
+        ids, pages = self.walk('/api/recipes/', {})
+        self.assertEqual(ids, list(
+            Recipe.objects.order_by('-pub_date', '-pk')
+            .values_list('pk', flat=True)
+        ))
+        self.assertEqual(pages, 5)
+
+    def test_popular_recipes(self):
+        ids, _ = self.walk('/api/recipes/', {'ordering': 'popular'})
+        self.assertEqual(ids, list(
+            Recipe.objects.order_by('-popularity', '-pub_date', '-pk')
+            .values_list('pk', flat=True)
+        ))
+
+    def test_users(self):
+        ids, _ = self.walk('/api/users/', {})
+        self.assertEqual(ids, list(
+            User.objects.order_by('username', 'pk')
+            .values_list('pk', flat=True)
+        ))
+
+    def test_new_recipe_does_not_shift_pages(self):
+        first = self.client.get('/api/recipes/', {'cursor': '', 'limit': 5})
+        Recipe.objects.create(
+            author=self.author, name='Новый', text='Описание',
+            image='recipes/recipe.png', cooking_time=10,
+        )
+        cache.clear()
+        second = self.client.get(first.data['next'])
+        expected = list(
+            Recipe.objects.exclude(name='Новый')
+            .order_by('-pub_date', '-pk').values_list('pk', flat=True)
+        )[5:10]
+        self.assertEqual(
+            [item['id'] for item in second.data['results']], expected,
+        )
+
+    def test_invalid_cursor(self):
+        response = self.client.get('/api/recipes/', {'cursor': 'broken'})
+        self.assertEqual(response.status_code, 404)
+
+    def test_page_numbers_without_cursor(self):
+        response = self.client.get('/api/recipes/', {'limit': 5})
+        self.assertEqual(response.data['count'], 23)
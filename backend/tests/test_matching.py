@@ -0,0 +1,103 @@
+import random
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase
+
+from api.cards import invalidate_recipe_cards
+from api.matching import RecipeMatcher
+from recipes.models import Ingredient, Recipe, RecipeIngredient
+from users.models import User
+
+
+class RecipeMatcherTest(TestCase):
+    """Подбор рецептов совпадает с перебором и не перечитывается зря."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(
+            email='author@example.com', username='author',
+            first_name='Author', last_name='Author', password='secret',
+        )
+        cls.ingredients = Ingredient.objects.bulk_create(
+            Ingredient(name=f'Ингредиент {number}', measurement_unit='г')
+            for number in range(12)
+        )
+        generator = random.Random(19)
+        for number in range(80):
+            recipe = cls.create_recipe(number)
+            RecipeIngredient.objects.bulk_create(
+                RecipeIngredient(
+                    recipe=recipe, ingredient=ingredient, amount=1,
+                )
+                for ingredient in generator.sample(
+                    cls.ingredients, generator.randint(1, 6),
+                )
+            )
+
+    @classmethod
+    def create_recipe(cls, number):
+        return Recipe.objects.create(
+            author=cls.author, name=f'Рецепт {number}', text='Описание',
+            image='recipes/recipe.png', cooking_time=10,
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.matcher = RecipeMatcher()
+
+    def brute_force(self, ingredient_ids, max_missing=None):
+        ingredient_ids = set(ingredient_ids)
+        results = []
+        recipes = Recipe.objects.order_by('-pub_date', '-pk')
+        for position, recipe in enumerate(recipes.prefetch_related(
+            'recipe_ingredients',
+        )):
+            own = {
+                row.ingredient_id for row in recipe.recipe_ingredients.all()
+            }
+            matched = len(own & ingredient_ids)
+            if not matched or (
+                max_missing is not None and len(own) - matched > max_missing
+            ):
+                continue
+            results.append((
+                (-matched / len(own), -matched, position),
+                (recipe.pk, matched, len(own)),
+            ))
+        return [result for _, result in sorted(results)]
+
+    def test_matches_brute_force(self):
+        generator = random.Random(7)
+        ids = [ingredient.pk for ingredient in self.ingredients]
+        for _ in range(20):
+            wanted = generator.sample(ids, generator.randint(1, 8))
+            max_missing = generator.choice((None, 0, 1, 3))
+            self.assertEqual(
+                self.matcher.match(wanted, max_missing),
+                self.brute_force(wanted, max_missing),
+            )
+
+    def test_unknown_ingredient(self):
+        self.assertEqual(self.matcher.match([10 ** 6]), [])
+
+    def test_reloads_only_on_composition_changes(self):
+        wanted = [self.ingredients[0].pk]
+        self.matcher.match(wanted)
+        with mock.patch.object(
+            self.matcher, '_load', wraps=self.matcher._load,
+        ) as load:
+            with self.captureOnCommitCallbacks(execute=True):
+                invalidate_recipe_cards()
+            self.matcher.match(wanted)
+            load.assert_not_called()
+
+            with self.captureOnCommitCallbacks(execute=True):
+                recipe = self.create_recipe(100)
+                RecipeIngredient.objects.create(
+                    recipe=recipe, ingredient=self.ingredients[0], amount=1,
+                )
+            self.assertIn(
+                (recipe.pk, 1, 1), self.matcher.match(wanted),
+            )
+            load.assert_called_once()
@@ -0,0 +1,85 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from recipes.constants import (
+    POPULARITY_HALF_LIFE_DAYS, POPULARITY_WINDOW_DAYS
+)
+from recipes.models import Favorite, Recipe, ShoppingCart
+from users.models import User
+
+
+class PopularityTest(TestCase):
+    """Популярность с затуханием и сортировка ordering=popular."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.users = [
+            User.objects.create_user(
+                email=f'user{number}@example.com', username=f'user{number}',
+                first_name='User', last_name='User', password='secret',
+            )
+            for number in range(3)
+        ]
+        cls.fresh, cls.old, cls.cart, cls.quiet = (
+            Recipe.objects.create(
+                author=cls.users[0], name=name, text='Описание',
+                image='recipes/recipe.png', cooking_time=10,
+            )
+            for name in ('Свежий', 'Старый', 'В корзине', 'Тихий')
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def rank(self):
+        call_command('rank_recipes', stdout=StringIO())
+        return {
+            recipe.name: recipe.popularity for recipe in Recipe.objects.all()
+        }
+
+    def age(self, model, recipe, days):
+        model.objects.filter(recipe=recipe).update(
+            created=timezone.now() - timedelta(days=days),
+        )
+
+    def test_scores_decay(self):
+        for user in self.users[:2]:
+            Favorite.objects.create(user=user, recipe=self.fresh)
+            Favorite.objects.create(user=user, recipe=self.old)
+        self.age(Favorite, self.old, POPULARITY_HALF_LIFE_DAYS)
+        ShoppingCart.objects.create(user=self.users[2], recipe=self.cart)
+        scores = self.rank()
+        self.assertAlmostEqual(scores['Свежий'], 2, places=3)
+        self.assertAlmostEqual(scores['Старый'], 1, places=3)
+        self.assertAlmostEqual(scores['В корзине'], 2, places=3)
+        self.assertEqual(scores['Тихий'], 0)
+
+    def test_outside_window_is_reset(self):
+        Favorite.objects.create(user=self.users[0], recipe=self.old)
+        self.assertGreater(self.rank()['Старый'], 0)
+        self.age(Favorite, self.old, POPULARITY_WINDOW_DAYS + 1)
+        self.assertEqual(self.rank()['Старый'], 0)
+
+    def test_ordering(self):
+        Favorite.objects.create(user=self.users[0], recipe=self.old)
+        for user in self.users:
+            Favorite.objects.create(user=user, recipe=self.quiet)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.rank()
+        response = APIClient().get('/api/recipes/', {'ordering': 'popular'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [recipe['name'] for recipe in response.data['results']],
+            ['Тихий', 'Старый', 'В корзине', 'Свежий'],
+        )
+        response = APIClient().get('/api/recipes/', {'ordering': 'new'})
+        self.assertEqual(
+            [recipe['name'] for recipe in response.data['results']],
+            ['Тихий', 'В корзине', 'Старый', 'Свежий'],
+        )
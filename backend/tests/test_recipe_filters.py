@@ -0,0 +1,77 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from api.filters import RecipeFilter
+from recipes.models import Favorite, Recipe, Tag
+from users.models import User
+
+
+class RecipeTagFilterTest(TestCase):
+    """Фильтры по тегам и спискам пользователя через EXISTS."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            email='reader@example.com', username='reader',
+            first_name='Reader', last_name='Reader', password='secret',
+        )
+        cls.lunch = Tag.objects.create(name='Обед', slug='lunch')
+        cls.dinner = Tag.objects.create(
+            name='Ужин', slug='dinner', color=Tag.BLUE,
+        )
+        cls.soup, cls.porridge, cls.salad = (
+            Recipe.objects.create(
+                author=cls.user, name=name, text='Описание',
+                image='recipes/recipe.png', cooking_time=10,
+            )
+            for name in ('Суп', 'Каша', 'Салат')
+        )
+        cls.soup.tags.set((cls.lunch, cls.dinner))
+        cls.porridge.tags.set((cls.dinner,))
+        Favorite.objects.create(user=cls.user, recipe=cls.soup)
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def names(self, params):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get('/api/recipes/', params)
+        self.assertEqual(response.status_code, 200)
+        for query in context.captured_queries:
+            self.assertNotIn('DISTINCT', query['sql'])
+        return response.data['count'], [
+            recipe['name'] for recipe in response.data['results']
+        ]
+
+    def test_each_recipe_once(self):
+        self.assertEqual(
+            self.names({'tags': ['lunch', 'dinner']}), (2, ['Каша', 'Суп']),
+        )
+        self.assertEqual(self.names({'tags': ['lunch']}), (1, ['Суп']))
+
+    def test_unknown_slug(self):
+        response = self.client.get('/api/recipes/', {'tags': ['breakfast']})
+        self.assertEqual(response.status_code, 400)
+
+    def test_deleted_tag_skipped(self):
+        recipe_filter = RecipeFilter(queryset=Recipe.objects.all())
+        with self.captureOnCommitCallbacks(execute=True):
+            self.dinner.delete()
+        self.assertEqual(
+            list(recipe_filter.get_tags(
+                Recipe.objects.all(), 'tags', ['lunch', 'dinner'],
+            )),
+            [self.soup],
+        )
+
+    def test_user_lists(self):
+        self.client.force_authenticate(self.user)
+        self.assertEqual(
+            self.names({'is_favorited': 1, 'tags': ['dinner']}),
+            (1, ['Суп']),
+        )
+        self.assertEqual(self.names({'is_in_shopping_cart': 1}), (0, []))
@@ -0,0 +1,84 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from recipes.models import (
+    Ingredient, Recipe, RecipeCard, RecipeIngredient, Tag
+)
+from users.models import User
+
+
+class RecipeListQueriesTest(TestCase):
+    """Число запросов списка рецептов не зависит от размера страницы."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            email='reader@example.com', username='reader',
+            first_name='Reader', last_name='Reader', password='secret',
+        )
+        authors = [
+            User.objects.create_user(
+                email=f'author{number}@example.com',
+                username=f'author{number}', first_name='Author',
+                last_name=str(number), password='secret',
+            )
+            for number in range(5)
+        ]
+        tags = [
+            Tag.objects.create(
+                name=f'Тег {number}', slug=f'tag{number}', color=color,
+            )
+            for number, color in enumerate((Tag.RED, Tag.GREEN))
+        ]
+        ingredients = [
+            Ingredient.objects.create(
+                name=f'Ингредиент {number}', measurement_unit='г',
+            )
+            for number in range(3)
+        ]
+        for number in range(60):
+            recipe = Recipe.objects.create(
+                author=authors[number % len(authors)],
+                name=f'Рецепт {number}', text='Описание',
+                image='recipes/recipe.png', cooking_time=10,
+            )
+            recipe.tags.set(tags)
+            RecipeIngredient.objects.bulk_create(
+                RecipeIngredient(
+                    recipe=recipe, ingredient=ingredient, amount=number + 1,
+                )
+                for ingredient in ingredients
+            )
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def count_queries(self, limit, cards=True):
+        # Без закешированного ответа и версий: каждый замер в равных условиях.
+        cache.clear()
+        if not cards:
+            RecipeCard.objects.all().delete()
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get('/api/recipes/', {'limit': limit})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['results']), limit)
+        return len(context.captured_queries)
+
+    def assert_constant(self):
+        self.client.get('/api/recipes/', {'limit': 60})
+        self.assertEqual(self.count_queries(2), self.count_queries(50))
+        # Недостающие карточки собираются при чтении тоже пакетно.
+        self.assertEqual(
+            self.count_queries(2, cards=False),
+            self.count_queries(50, cards=False),
+        )
+
+    def test_anonymous(self):
+        self.assert_constant()
+
+    def test_authenticated(self):
+        self.client.force_authenticate(self.user)
+        self.assert_constant()
@@ -0,0 +1,153 @@
+import time
+from contextvars import copy_context
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase
+from django.test.utils import override_settings
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from api.middleware import PRIMARY_STICKY_COOKIE, PrimaryStickinessMiddleware
+from api.routers import (
+    PrimaryReplicaRouter, pin_primary_after_change, primary_pinned,
+    use_primary
+)
+from recipes.models import Recipe, RecipeCard
+from users.models import User
+
+
+@override_settings(DATABASE_REPLICAS=['replica1'])
+class PrimaryReplicaRouterTest(SimpleTestCase):
+    router = PrimaryReplicaRouter()
+
+    def test_reads_go_to_replica(self):
+        self.assertEqual(self.router.db_for_read(Recipe), 'replica1')
+        self.assertEqual(self.router.db_for_write(Recipe), 'default')
+
+    def test_pinned_reads_go_to_primary(self):
+        with use_primary():
+            self.assertEqual(self.router.db_for_read(Recipe), 'default')
+        self.assertEqual(self.router.db_for_read(Recipe), 'replica1')
+
+    def test_tokens_are_read_from_primary(self):
+        self.assertEqual(self.router.db_for_read(Token), 'default')
+
+    def test_recent_change_pins_request(self):
+        def read_after(last_modified):
+            pin_primary_after_change(last_modified)
+            return self.router.db_for_read(Recipe)
+
+        self.assertEqual(
+            copy_context().run(read_after, time.time()), 'default',
+        )
+        self.assertEqual(
+            copy_context().run(read_after, time.time() - 3600), 'replica1',
+        )
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_without_replicas(self):
+        self.assertEqual(self.router.db_for_read(Recipe), 'default')
+
+
+@override_settings(DATABASE_REPLICAS=['replica1'])
+class PrimaryStickinessMiddlewareTest(SimpleTestCase):
+    factory = RequestFactory()
+
+    def setUp(self):
+        cache.clear()
+        self.status = 200
+        self.pinned = None
+        self.middleware = PrimaryStickinessMiddleware(self.get_response)
+
+    def get_response(self, request):
+        self.pinned = primary_pinned.get()
+        return HttpResponse(status=self.status)
+
+    def test_safe_request_reads_replica(self):
+        self.middleware(self.factory.get('/api/recipes/'))
+        self.assertFalse(self.pinned)
+
+    def test_write_pins_browser_by_cookie(self):
+        response = self.middleware(self.factory.post('/api/recipes/'))
+        self.assertTrue(self.pinned)
+        self.assertIn(PRIMARY_STICKY_COOKIE, response.cookies)
+        request = self.factory.get('/api/recipes/')
+        request.COOKIES[PRIMARY_STICKY_COOKIE] = '1'
+        self.middleware(request)
+        self.assertTrue(self.pinned)
+
+    def test_write_pins_token_client(self):
+        headers = {'HTTP_AUTHORIZATION': 'Token secret'}
+        self.middleware(self.factory.post('/api/recipes/', **headers))
+        self.middleware(self.factory.get('/api/recipes/', **headers))
+        self.assertTrue(self.pinned)
+        self.middleware(self.factory.get(
+            '/api/recipes/', HTTP_AUTHORIZATION='Token other',
+        ))
+        self.assertFalse(self.pinned)
+
+    def test_failed_write_does_not_pin(self):
+        self.status = 400
+        headers = {'HTTP_AUTHORIZATION': 'Token secret'}
+        response = self.middleware(
+            self.factory.post('/api/recipes/', **headers),
+        )
+        self.assertNotIn(PRIMARY_STICKY_COOKIE, response.cookies)
+        self.middleware(self.factory.get('/api/recipes/', **headers))
+        self.assertFalse(self.pinned)
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_disabled_without_replicas(self):
+        with self.assertRaises(MiddlewareNotUsed):
+            PrimaryStickinessMiddleware(self.get_response)
+
+
+class RecipeDeletedOnPrimaryTest(TestCase):
+    """
+    Рецепт прочитан с отставшей реплики без карточки, а в основной БД
+    уже удалён: карточку собрать не из чего.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        author = User.objects.create_user(
+            email='author@example.com', username='author',
+            first_name='Author', last_name='Author', password='secret',
+        )
+        cls.recipes = [
+            Recipe.objects.create(
+                author=author, name=f'Рецепт {number}', text='Описание',
+                image='recipes/recipe.png', cooking_time=10,
+            )
+            for number in range(2)
+        ]
+
+    def setUp(self):
+        cache.clear()
+        RecipeCard.objects.all().delete()
+        deleted = self.recipes[0].pk
+        refresh = mock.patch(
+            'api.serializers.refresh_recipe_cards',
+            side_effect=lambda ids: {
+                pk: RecipeCard(recipe_id=pk, data={}) for pk in ids
+                if pk != deleted
+            },
+        )
+        refresh.start()
+        self.addCleanup(refresh.stop)
+
+    def test_list_skips_recipe(self):
+        with mock.patch(
+            'api.serializers.RecipeCardSerializer.to_representation',
+            side_effect=lambda recipe: recipe.pk,
+        ):
+            response = APIClient().get('/api/recipes/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['results'], [self.recipes[1].pk])
+
+    def test_detail_not_found(self):
+        response = APIClient().get(f'/api/recipes/{self.recipes[0].pk}/')
+        self.assertEqual(response.status_code, 404)
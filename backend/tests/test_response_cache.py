@@ -0,0 +1,70 @@
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from api.cache import RECIPES_VERSION, get_counters, get_version
+from api.constants import RESPONSE_CACHE_HITS, RESPONSE_CACHE_MISSES
+from recipes.models import Recipe, Tag
+from users.models import User
+
+
+class AnonymousResponseCacheTest(TestCase):
+    """Кеш анонимных ответов со списком и карточкой рецепта."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(
+            email='author@example.com', username='author',
+            first_name='Author', last_name='Author', password='secret',
+        )
+        Tag.objects.create(name='Обед', slug='a', color=Tag.RED)
+        Tag.objects.create(name='Ужин', slug='b', color=Tag.BLUE)
+        cls.recipe = Recipe.objects.create(
+            author=cls.author, name='Суп', text='Описание',
+            image='recipes/recipe.png', cooking_time=10,
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def get(self, path='/api/recipes/', params=None):
+        response = self.client.get(path, params)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_hit_after_miss(self):
+        for path in ('/api/recipes/', f'/api/recipes/{self.recipe.pk}/'):
+            with self.subTest(path=path):
+                self.assertEqual(self.get(path)['X-Cache'], 'MISS')
+                self.assertEqual(self.get(path)['X-Cache'], 'HIT')
+        self.assertEqual(
+            get_counters((RESPONSE_CACHE_HITS, RESPONSE_CACHE_MISSES)),
+            {RESPONSE_CACHE_HITS: 2, RESPONSE_CACHE_MISSES: 2},
+        )
+
+    def test_parameters_are_normalized(self):
+        self.get(params={'tags': ['b', 'a'], 'limit': 5})
+        response = self.get(params={'limit': 5, 'tags': ['a', 'b']})
+        self.assertEqual(response['X-Cache'], 'HIT')
+
+    def test_not_cached(self):
+        self.get(params={'utm': 'x'})
+        self.assertNotIn('X-Cache', self.get(params={'utm': 'x'}))
+        self.client.force_authenticate(self.author)
+        self.assertNotIn('X-Cache', self.get())
+
+    def test_invalidated_after_commit(self):
+        self.get()
+        version = get_version(RECIPES_VERSION)
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.recipe.name = 'Борщ'
+            self.recipe.save()
+            # До фиксации версия прежняя: параллельный запрос
+            # не закеширует старые данные под новой версией.
+            self.assertEqual(get_version(RECIPES_VERSION), version)
+        for callback in callbacks:
+            callback()
+        response = self.get()
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['results'][0]['name'], 'Борщ')
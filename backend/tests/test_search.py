@@ -0,0 +1,68 @@
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from api.search import update_search_documents
+from recipes.models import Ingredient, Recipe, RecipeIngredient
+from users.models import User
+
+
+class RecipeSearchTest(TestCase):
+    """Поиск по названию, ингредиентам и описанию с ранжированием."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(
+            email='author@example.com', username='author',
+            first_name='Author', last_name='Author', password='secret',
+        )
+        cls.mushrooms = Ingredient.objects.create(
+            name='Грибы', measurement_unit='г',
+        )
+        cls.named = cls.create_recipe('Грибной суп', 'Наваристый')
+        cls.with_ingredient = cls.create_recipe('Паста', 'Сливочная')
+        RecipeIngredient.objects.create(
+            recipe=cls.with_ingredient, ingredient=cls.mushrooms, amount=100,
+        )
+        cls.described = cls.create_recipe('Ризотто', 'Подаётся с грибами')
+        cls.create_recipe('Борщ', 'Со сметаной')
+        # Документ нового рецепта собирает сериализатор после
+        # добавления ингредиентов.
+        update_search_documents(author=cls.author)
+
+    @classmethod
+    def create_recipe(cls, name, text):
+        return Recipe.objects.create(
+            author=cls.author, name=name, text=text,
+            image='recipes/recipe.png', cooking_time=10,
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def search(self, value):
+        response = self.client.get('/api/recipes/', {'search': value})
+        self.assertEqual(response.status_code, 200)
+        return [recipe['name'] for recipe in response.data['results']]
+
+    def test_name_match_ranks_first(self):
+        self.assertEqual(
+            self.search('ГРИБ'), ['Грибной суп', 'Ризотто', 'Паста'],
+        )
+
+    def test_all_terms_required(self):
+        self.assertEqual(self.search('гриб сливочная'), ['Паста'])
+        self.assertEqual(self.search('гриб сметаной'), [])
+
+    def test_blank_query(self):
+        self.assertEqual(len(self.search('   ')), 4)
+
+    def test_document_follows_changes(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.mushrooms.name = 'Шампиньоны'
+            self.mushrooms.save()
+        self.assertEqual(self.search('шампиньон'), ['Паста'])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.with_ingredient.recipe_ingredients.all().delete()
+        self.assertEqual(self.search('шампиньон'), [])
@@ -0,0 +1,169 @@
+import csv
+from io import StringIO
+
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from api.utils import shopping_cart_pdf_font
+from recipes.management.commands.rebuild_cart_totals import rebuild_totals
+from recipes.models import (
+    Ingredient, Recipe, RecipeIngredient, ShoppingCartTotal
+)
+from users.models import User
+
+
+class ShoppingCartDownloadTest(TestCase):
+    """Выгрузка корзины покупок в текст, CSV и PDF."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            email='buyer@example.com', username='buyer',
+            first_name='Buyer', last_name='Buyer', password='secret',
+        )
+        for name, amount in (('Соль', 5), ('Мука', 300)):
+            ShoppingCartTotal.objects.create(
+                user=cls.user,
+                ingredient=Ingredient.objects.create(
+                    name=name, measurement_unit='г',
+                ),
+                name=name, measurement_unit='г', amount=amount,
+            )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def download(self, file_format):
+        return self.client.get(
+            '/api/recipes/download_shopping_cart/',
+            {'file_format': file_format},
+        )
+
+    def test_txt(self):
+        response = self.download('txt')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(
+            b''.join(response.streaming_content).decode().splitlines()[2:],
+            ['Мука, 300 г', 'Соль, 5 г'],
+        )
+
+    def test_csv(self):
+        response = self.download('csv')
+        self.assertEqual(response.status_code, 200)
+        rows = list(csv.reader(StringIO(
+            b''.join(response.streaming_content).decode(),
+        )))
+        self.assertEqual(rows[1:], [['Мука', '300', 'г'], ['Соль', '5', 'г']])
+
+    def test_pdf(self):
+        response = self.download('pdf')
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.streaming)
+        self.assertTrue(response.content.startswith(b'%PDF'))
+        self.assertEqual(
+            int(response['Content-Length']), len(response.content),
+        )
+
+    @override_settings(SHOPPING_CART_PDF_FONT='/nonexistent/font.ttf')
+    def test_pdf_without_font(self):
+        shopping_cart_pdf_font.cache_clear()
+        self.addCleanup(shopping_cart_pdf_font.cache_clear)
+        with self.assertLogs('api.views', 'ERROR'):
+            response = self.download('pdf')
+        self.assertEqual(response.status_code, 503)
+
+    def test_unknown_format(self):
+        self.assertEqual(self.download('doc').status_code, 400)
+
+
+class ShoppingCartTotalsTest(TestCase):
+    """Итоги корзины совпадают с пересчётом по её содержимому."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(
+            email='author@example.com', username='author',
+            first_name='Author', last_name='Author', password='secret',
+        )
+        cls.buyer = User.objects.create_user(
+            email='buyer@example.com', username='buyer',
+            first_name='Buyer', last_name='Buyer', password='secret',
+        )
+        cls.salt, cls.flour, cls.sugar = (
+            Ingredient.objects.create(name=name, measurement_unit='г')
+            for name in ('Соль', 'Мука', 'Сахар')
+        )
+        cls.bread = cls.create_recipe('Хлеб', {cls.salt: 5, cls.flour: 300})
+        cls.soup = cls.create_recipe('Суп', {cls.salt: 10})
+
+    @classmethod
+    def create_recipe(cls, name, amounts):
+        recipe = Recipe.objects.create(
+            author=cls.author, name=name, text='Описание',
+            image='recipes/recipe.png', cooking_time=10,
+        )
+        RecipeIngredient.objects.bulk_create(
+            RecipeIngredient(
+                recipe=recipe, ingredient=ingredient, amount=amount,
+            )
+            for ingredient, amount in amounts.items()
+        )
+        return recipe
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.buyer)
+
+    def assert_totals(self, expected):
+        totals = {
+            name: amount for name, _, amount in
+            ShoppingCartTotal.objects.filter(user=self.buyer)
+            .values_list('name', 'measurement_unit', 'amount')
+        }
+        self.assertEqual(totals, expected)
+        self.assertEqual(rebuild_totals([self.buyer.pk]), 0)
+
+    def add(self, recipe):
+        response = self.client.post(
+            f'/api/recipes/{recipe.pk}/shopping_cart/',
+        )
+        self.assertEqual(response.status_code, 201)
+
+    def test_add_and_remove(self):
+        self.add(self.bread)
+        self.assert_totals({'Соль': 5, 'Мука': 300})
+        self.add(self.soup)
+        self.assert_totals({'Соль': 15, 'Мука': 300})
+        self.client.delete(f'/api/recipes/{self.bread.pk}/shopping_cart/')
+        self.assert_totals({'Соль': 10})
+        self.client.post('/api/recipes/bulk_shopping_cart/', {
+            'add': [self.bread.pk], 'remove': [self.soup.pk],
+        }, format='json')
+        self.assert_totals({'Соль': 5, 'Мука': 300})
+
+    def test_recipe_edit(self):
+        self.add(self.bread)
+        self.add(self.soup)
+        self.client.force_authenticate(self.author)
+        response = self.client.patch(f'/api/recipes/{self.bread.pk}/', {
+            'ingredients': [
+                {'id': self.flour.pk, 'amount': 200},
+                {'id': self.sugar.pk, 'amount': 20},
+            ],
+        }, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assert_totals({'Соль': 10, 'Мука': 200, 'Сахар': 20})
+
+    def test_recipe_delete(self):
+        self.add(self.bread)
+        self.add(self.soup)
+        self.soup.delete()
+        self.assert_totals({'Соль': 5, 'Мука': 300})
+
+    def test_ingredient_rename(self):
+        self.add(self.bread)
+        self.flour.name = 'Мука пшеничная'
+        self.flour.save()
+        self.assert_totals({'Соль': 5, 'Мука пшеничная': 300})
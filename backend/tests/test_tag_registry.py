@@ -0,0 +1,63 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from api.registry import TagRegistry
+from recipes.models import Tag
+from users.models import User
+
+
+class TagRegistryTest(TestCase):
+    """Теги читаются из памяти процесса и обновляются после изменений."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.lunch = Tag.objects.create(name='Обед', slug='lunch')
+
+    def setUp(self):
+        cache.clear()
+        self.registry = TagRegistry()
+
+    def test_no_queries_when_loaded(self):
+        self.assertEqual(list(self.registry.all()), [self.lunch])
+        with CaptureQueriesContext(connection) as context:
+            self.assertEqual(self.registry.get(self.lunch.pk), self.lunch)
+            self.assertEqual(
+                self.registry.get_by_slug('lunch'), self.lunch,
+            )
+            self.assertIsNone(self.registry.get(0))
+        self.assertEqual(context.captured_queries, [])
+
+    def test_reload_after_save_and_delete(self):
+        self.registry.all()
+        with self.captureOnCommitCallbacks(execute=True):
+            dinner = Tag.objects.create(
+                name='Ужин', slug='dinner', color=Tag.BLUE,
+            )
+        self.assertEqual(self.registry.get_by_slug('dinner'), dinner)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.lunch.name = 'Поздний обед'
+            self.lunch.save()
+        self.assertEqual(
+            self.registry.get(self.lunch.pk).name, 'Поздний обед',
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            dinner.delete()
+        self.assertIsNone(self.registry.get_by_slug('dinner'))
+
+    async def test_async_access(self):
+        tags = await self.registry.aall()
+        self.assertEqual(list(tags), [self.lunch])
+        self.assertEqual(await self.registry.aget(self.lunch.pk), self.lunch)
+
+    def test_recipe_tags_validated_from_registry(self):
+        client = APIClient()
+        client.force_authenticate(User.objects.create_user(
+            email='author@example.com', username='author',
+            first_name='Author', last_name='Author', password='secret',
+        ))
+        response = client.post('/api/recipes/', {'tags': [0]}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('tags', response.data)
@@ -0,0 +1,79 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from api.authentication import token_cache
+from users.models import User
+
+
+class TokenCacheTest(TestCase):
+    """Кеш токенов сбрасывается выходом, сменой пароля и деактивацией."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            email='reader@example.com', username='reader',
+            first_name='Reader', last_name='Reader', password='secret',
+        )
+        cls.token = Token.objects.create(user=cls.user)
+
+    def setUp(self):
+        cache.clear()
+        token_cache._entries.clear()
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+    def me(self):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get('/api/users/me/')
+        token_queries = [
+            query for query in context.captured_queries
+            if 'authtoken_token' in query['sql']
+        ]
+        return response, token_queries
+
+    def test_token_read_once(self):
+        response, token_queries = self.me()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(token_queries), 1)
+        response, token_queries = self.me()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(token_queries, [])
+
+    def test_logout(self):
+        self.me()
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/api/auth/token/logout/')
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(self.me()[0].status_code, 401)
+
+    def test_deactivation(self):
+        self.me()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.is_active = False
+            self.user.save()
+        self.assertEqual(self.me()[0].status_code, 401)
+
+    def test_password_change(self):
+        self.me()
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/api/users/set_password/', {
+                'current_password': 'secret',
+                'new_password': 'NewSecret-2024',
+            })
+        self.assertEqual(response.status_code, 200)
+        response, token_queries = self.me()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(token_queries), 1)
+        self.assertTrue(response.wsgi_request.user.check_password(
+            'NewSecret-2024',
+        ))
+
+    def test_cached_user_is_copied(self):
+        self.me()
+        first = self.me()[0].wsgi_request.user
+        second = self.me()[0].wsgi_request.user
+        self.assertIsNot(first, second)
@@ -0,0 +1,13 @@
+import base64
+from io import BytesIO
+
+from PIL import Image
+
+
+def image_payload(size=(4, 3)):
+    """Изображение PNG в виде data URI, как его присылает клиент."""
+    buffer = BytesIO()
+    Image.new('RGB', size, 'red').save(buffer, format='PNG')
+    return 'data:image/png;base64,' + base64.b64encode(
+        buffer.getvalue(),
+    ).decode()
@@ -3,6 +3,7 @@ from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from django.contrib.auth.models import Group
 
+from recipes.admin import ReadOnlyAdmin
 from users.models import Follow, User
 
 
@@ -15,7 +16,10 @@ class UserChangeForm(forms.ModelForm):
 
 class UserAdmin(BaseUserAdmin):
     form = UserChangeForm
-    list_display = ('email', 'username', 'first_name', 'last_name')
+    list_display = (
+        'email', 'username', 'first_name', 'last_name',
+        'recipes_count', 'followers_count',
+    )
     fieldsets = (
         (None, {'fields': ('email', 'password', 'is_superuser', 'is_staff')}),
         ('Personal info', {'fields': ('username', 'first_name', 'last_name')}),
@@ -40,6 +44,6 @@ class UserAdmin(BaseUserAdmin):
 
 
 admin.site.register(User, UserAdmin)
-admin.site.register(Follow)
+admin.site.register(Follow, ReadOnlyAdmin)
 if not admin.site.is_registered(Group):
     admin.site.register(Group)
@@ -2,13 +2,14 @@ from django.contrib.auth.models import AbstractUser
 from django.core.exceptions import ValidationError
 from django.db import models
 
+from core.models import CounterFieldsMixin
 from users.constants import (
     MAX_LENGTH_USERNAME, MAX_LENGTH_FIRST_NAME, MAX_LENGTH_LAST_NAME,
     MAX_LENGTH_EMAIL, MAX_LENGTH_PASSWORD,
 )
 
 
-class User(AbstractUser):
+class User(CounterFieldsMixin, AbstractUser):
     username = models.CharField(
         max_length=MAX_LENGTH_USERNAME,
         unique=True,
@@ -29,6 +30,17 @@ class User(AbstractUser):
         max_length=MAX_LENGTH_PASSWORD,
         blank=False,
     )
+    recipes_count = models.PositiveIntegerField(
+        'Количество рецептов',
+        default=0,
+        editable=False,
+    )
+    followers_count = models.PositiveIntegerField(
+        'Количество подписчиков',
+        default=0,
+        editable=False,
+    )
+    counter_fields = ('recipes_count', 'followers_count')
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = ('username', 'first_name', 'last_name', 'password')
 